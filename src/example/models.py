@@ -9,6 +9,7 @@ class Book(models.Model):
     checked_out = models.BooleanField(default=False,verbose_name='Checked Out')
     ordered_from = models.CharField(max_length=100, blank=True, null=True, verbose_name='Ordered From')
     location = models.CharField(max_length=100, blank=True, null=True, verbose_name='Location')
+    updated_at = models.DateTimeField(auto_now=True, verbose_name='Updated At')
     
     @property
     def formatted_price(self):
@@ -16,10 +16,12 @@ Including another URLconf
 """
 from django.contrib import admin
 from django.urls import path
+from orange_sherbert.profiling import get_profiling_urls
 from .views import BookCRUDView, AuthorCRUDView
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     *BookCRUDView.get_urls(),
     *AuthorCRUDView.get_urls(),
+    *get_profiling_urls(),
 ]
@@ -1,6 +1,7 @@
-from orange_sherbert.view import CRUDView
+from orange_sherbert.view import CRUDView, AsyncCRUDView
 from .models import Book, Author, BookRequest, RequestComment
 from django.views import View
+from django.db.models import Count, Q
 from django.shortcuts import redirect
 
 class OrderOnlineView(View):
@@ -8,20 +9,6 @@ class OrderOnlineView(View):
         book = Book.objects.get(pk=pk)
         return redirect(f'https://www.barnesandnoble.com/s/{book.title}')
 
-class CheckOutView(View):
-    def post(self, request, pk):
-        book = Book.objects.get(pk=pk)
-        book.checked_out = True
-        book.save()
-        return redirect(request.META.get('HTTP_REFERER', 'book-list'))
-
-class CheckInView(View):
-    def post(self, request, pk):
-        book = Book.objects.get(pk=pk)
-        book.checked_out = False
-        book.save()
-        return redirect(request.META.get('HTTP_REFERER', 'book-list'))
-
 class BookCRUDView(CRUDView):
     model = Book
     fields = {
@@ -42,10 +29,22 @@ class BookCRUDView(CRUDView):
         'ordered_from': 'Ordered From',
         'location': 'Location',
     }
-    filter_fields = {'author': 'Author', 'checked_out': 'Checked Out'}
+    filter_fields = {
+        'author': {'label': 'Author', 'type': 'multi'},
+        'pub_date': {'label': 'Publication Date', 'type': 'range'},
+        'checked_out': {'label': 'Checked Out', 'type': 'boolean'},
+        'location': {'label': 'Location', 'type': 'null'},
+    }
     search_fields = ['title', 'isbn']
     restricted_fields = {'ordered_from': 'can_view_ordered_from'}
     property_field_map = {'formatted_price': 'price'}
+    inline_edit_fields = ['checked_out', 'location']
+    api = True
+    version_field = 'updated_at'
+    aggregates = {
+        'formatted_price': ['sum', 'avg'],
+        'checked_out': ('Out', Count('pk', filter=Q(checked_out=True))),
+    }
 
     inline_formsets = [
         {
@@ -72,20 +71,20 @@ class BookCRUDView(CRUDView):
         {
             'name': 'check-in',
             'label': 'Check In',
-            'view': CheckInView,
-            'method': 'POST',
+            'update': {'checked_out': False},
+            'condition': {'checked_out': True},
             #'permission': 'can_check_in'
         },
         {
             'name': 'check-out',
             'label': 'Check Out',
-            'view': CheckOutView,
-            'method': 'POST',
+            'update': {'checked_out': True},
+            'condition': {'checked_out': False},
             #'permission': 'can_check_out'
         }
     ]
 
-class AuthorCRUDView(CRUDView):
+class AuthorCRUDView(AsyncCRUDView):
     model = Author
     fields = '__all__'
     search_fields = ['name']
\ No newline at end of file
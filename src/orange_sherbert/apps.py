@@ -1,7 +1,83 @@
 from django.apps import AppConfig
+from django.conf import settings
+from django.core import checks
+
+# Rendered on every form page and "+ Add" click; formset.html and form.html include each other
+PRECOMPILED_TEMPLATES = [
+    'orange_sherbert/includes/formset.html',
+    'orange_sherbert/includes/form.html',
+    'orange_sherbert/includes/list_rows.html',
+    'orange_sherbert/includes/field_cell.html',
+]
+
+
+def get_django_engines():
+    from django.template import engines
+    from django.template.backends.django import DjangoTemplates
+
+    return [engine.engine for engine in engines.all() if isinstance(engine, DjangoTemplates)]
+
+
+def uses_cached_loader(engine):
+    from django.template.loaders.cached import Loader as CachedLoader
+
+    return any(isinstance(loader, CachedLoader) for loader in engine.template_loaders)
+
+
+def check_cached_loader(app_configs=None, **kwargs):
+    return [
+        checks.Warning(
+            "A DjangoTemplates engine doesn't use the cached template loader.",
+            hint=(
+                "Orange Sherbert's recursive formset templates are re-read and re-parsed on every "
+                "render without it. Drop the custom 'loaders' option or wrap the loaders in "
+                "'django.template.loaders.cached.Loader'."
+            ),
+            id='orange_sherbert.W001',
+        )
+        for engine in get_django_engines() if not uses_cached_loader(engine)
+    ]
+
+
+def check_profiling_urls(app_configs=None, **kwargs):
+    from django.urls import NoReverseMatch, reverse
+
+    if 'orange_sherbert.profiling.CRUDProfilingMiddleware' not in settings.MIDDLEWARE:
+        return []
+    try:
+        reverse('orange_sherbert-profile', kwargs={'profile_id': '0' * 32})
+    except NoReverseMatch:
+        return [
+            checks.Warning(
+                "CRUDProfilingMiddleware is installed but its download URLs are not.",
+                hint="Add *get_profiling_urls() from orange_sherbert.profiling to your urlpatterns; until then ?_profile=1 is ignored.",
+                id='orange_sherbert.W002',
+            )
+        ]
+    return []
+
+
+def precompile_templates():
+    """Parse the recursive includes into the cached loader at startup instead of on the first request"""
+    from django.template import TemplateDoesNotExist
+
+    for engine in get_django_engines():
+        if not uses_cached_loader(engine):
+            continue
+        for name in PRECOMPILED_TEMPLATES:
+            try:
+                engine.get_template(name)
+            except TemplateDoesNotExist:
+                pass
 
 
 class OrangeSherbertConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'orange_sherbert'
     verbose_name = 'Orange Sherbert'
+
+    def ready(self):
+        checks.register(check_cached_loader, checks.Tags.templates)
+        checks.register(check_profiling_urls, checks.Tags.urls)
+        if getattr(settings, 'ORANGE_SHERBERT_PRECOMPILE_TEMPLATES', True):
+            precompile_templates()
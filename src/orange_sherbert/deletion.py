@@ -0,0 +1,131 @@
+"""
+Cascade walking for Orange Sherbert deletes.
+
+Django's Collector loads every cascaded row into memory before deleting anything. These
+helpers walk the same ON DELETE CASCADE relations as querysets instead, so large deletes can
+be previewed with COUNTs and carried out bottom-up in bounded batches.
+
+Batches commit one at a time, so PROTECT and RESTRICT referrers are looked for across the
+whole tree before the first batch: a delete that Django would refuse removes nothing.
+"""
+
+from django.db import models, transaction
+from django.db.models import ProtectedError, RestrictedError
+
+DEFAULT_BATCH_SIZE = 500
+
+
+def get_cascade_relations(model):
+    """Reverse one-to-many/one-to-one relations whose rows Django deletes along with model's."""
+    relations = []
+    for rel in model._meta.related_objects:
+        if rel.many_to_many or rel.on_delete is not models.CASCADE:
+            continue
+        relations.append((rel.related_model, rel.field))
+    return relations
+
+
+def walk_cascade(queryset, _path=()):
+    """
+    Yield (depth, model, queryset) for queryset and every row it cascades to, children first,
+    so deleting in this order never leaves a child pointing at a missing parent.
+    """
+    model = queryset.model
+    for related_model, field in get_cascade_relations(model):
+        key = (related_model, field.name)
+        # Self-referential trees (parent = ForeignKey('self')) are left to Django's own delete
+        if key in _path:
+            continue
+        children = related_model._base_manager.using(queryset.db).filter(
+            **{f'{field.name}__in': queryset.values('pk')}
+        )
+        for depth, child_model, child_queryset in walk_cascade(children, _path + (key,)):
+            yield depth + 1, child_model, child_queryset
+    yield 0, model, queryset
+
+
+def get_blocking_referrers(steps):
+    """
+    (on_delete, queryset) for each PROTECT or RESTRICT relation with rows pointing into steps,
+    the (model, queryset) pairs a delete would remove. RESTRICT referrers that are themselves
+    being deleted don't block, as in Django's Collector.
+    """
+    deleted = {}
+    for model, step in steps:
+        deleted.setdefault(model, []).append(step)
+
+    blocking = []
+    for model, step in steps:
+        for rel in model._meta.related_objects:
+            if rel.many_to_many or rel.on_delete not in (models.PROTECT, models.RESTRICT):
+                continue
+            referrers = rel.related_model._base_manager.using(step.db).filter(
+                **{f'{rel.field.name}__in': step.values('pk')}
+            )
+            if rel.on_delete is models.RESTRICT:
+                for deleted_step in deleted.get(rel.related_model, ()):
+                    referrers = referrers.exclude(pk__in=deleted_step.values('pk'))
+            if referrers.exists():
+                blocking.append((rel.on_delete, referrers))
+    return blocking
+
+
+def delete_in_batches(queryset, batch_size=DEFAULT_BATCH_SIZE, progress=None):
+    """
+    Delete queryset and everything it cascades to in batches of at most batch_size rows.
+
+    Each batch goes through QuerySet.delete(), so signals and SET_NULL behave as usual.
+    Raises ProtectedError or RestrictedError before deleting anything if a PROTECT or
+    RESTRICT relation would block the delete. progress(done, total, label) is called after
+    every batch. Returns rows deleted.
+    """
+    steps = [(model, step) for _, model, step in walk_cascade(queryset)]
+    for on_delete, referrers in get_blocking_referrers(steps):
+        error = ProtectedError if on_delete is models.PROTECT else RestrictedError
+        model = referrers.model
+        raise error(
+            f"Cannot delete {queryset.model._meta.verbose_name}: some of its rows are referenced "
+            f"by {model._meta.verbose_name_plural} through a {on_delete.__name__} foreign key.",
+            set(referrers[:10]),
+        )
+    total = sum(step.count() for _, step in steps)
+    done = 0
+    for model, step in steps:
+        label = model._meta.verbose_name_plural
+        while True:
+            pks = list(step.order_by().values_list('pk', flat=True)[:batch_size])
+            if not pks:
+                break
+            with transaction.atomic(using=step.db):
+                deleted, _ = model._base_manager.using(step.db).filter(pk__in=pks).delete()
+            done += deleted
+            if progress:
+                progress(min(done, total), total, label)
+    return done
+
+
+def get_cascade_summary(queryset, cap=1000):
+    """
+    Summarise what deleting queryset cascades to without loading any rows.
+
+    Returns [{'model', 'verbose_name', 'verbose_name_plural', 'count', 'capped'}] with one
+    entry per cascaded model, from one COUNT per relation limited to cap + 1 rows.
+    """
+    summary = {}
+    for depth, model, step in walk_cascade(queryset):
+        if depth == 0:
+            continue
+        count = step.order_by()[:cap + 1].count()
+        entry = summary.setdefault(model, {
+            'model': model,
+            'verbose_name': model._meta.verbose_name,
+            'verbose_name_plural': model._meta.verbose_name_plural,
+            'count': 0,
+            'capped': False,
+        })
+        if count > cap:
+            count = cap
+            entry['capped'] = True
+        entry['count'] += count
+    # Parents first, as the user thinks of them
+    return [entry for entry in reversed(summary.values()) if entry['count']]
@@ -0,0 +1,142 @@
+"""
+Query diagnostics for Orange Sherbert CRUD views.
+
+Captures every query issued while a CRUD request is handled, groups them by normalised
+SQL and points repeated per-row patterns (N+1s) at the `fields` entry or template node
+that triggered them. Enable for a project with ORANGE_SHERBERT_QUERY_DIAGNOSTICS = True,
+or use the helpers in orange_sherbert.testing from tests.
+"""
+
+import logging
+import os
+import re
+import sys
+from collections import Counter
+
+import django
+from django.db import connections
+
+logger = logging.getLogger('orange_sherbert.diagnostics')
+
+DEFAULT_REPEAT_THRESHOLD = 3
+
+_IN_LIST = re.compile(r'IN \((?:%s, )*%s\)')
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_WHITESPACE = re.compile(r'\s+')
+
+_VIEW_FILE = os.path.join('orange_sherbert', 'view.py')
+_DJANGO_DIR = os.path.dirname(django.__file__)
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Raised by the orange_sherbert.testing helpers when a CRUD request runs more queries than its view's query_budget allows."""
+
+
+def normalize_sql(sql):
+    """Collapse literals, IN lists and whitespace so per-row variants of a query compare equal."""
+    sql = _IN_LIST.sub('IN (...)', sql)
+    sql = _LITERALS.sub('?', sql)
+    return _WHITESPACE.sub(' ', sql).strip()
+
+
+def _query_source(frame):
+    """
+    Attribute a query to what caused it: the `fields` entry being evaluated by a CRUD view,
+    else the innermost template node being rendered, else the innermost project code line.
+    """
+    template_node = None
+    project_line = None
+    while frame is not None:
+        code = frame.f_code
+        if code.co_filename.endswith(_VIEW_FILE) and 'field_name' in frame.f_locals:
+            return f"fields['{frame.f_locals['field_name']}']"
+        if template_node is None and code.co_name == 'render_annotated':
+            node = frame.f_locals.get('self')
+            token = getattr(node, 'token', None)
+            origin = getattr(node, 'origin', None)
+            if token is not None and origin is not None:
+                tag = f'{{% {token.contents} %}}' if token.token_type.name == 'BLOCK' else f'{{{{ {token.contents} }}}}'
+                template_node = f'{origin.template_name}:{token.lineno} {tag}'
+        if project_line is None and not code.co_filename.startswith(_DJANGO_DIR) and 'site-packages' not in code.co_filename:
+            project_line = f'{code.co_filename}:{frame.f_lineno} in {code.co_name}'
+        frame = frame.f_back
+    return template_node or project_line or 'unknown'
+
+
+class QueryGroup:
+    def __init__(self, sql):
+        self.sql = sql
+        self.count = 0
+        self.sources = Counter()
+
+    def __repr__(self):
+        return f'<QueryGroup x{self.count}: {self.sql[:80]}>'
+
+
+class QueryReport:
+    """Queries captured for one request, grouped by normalised SQL."""
+
+    def __init__(self, queries):
+        self.queries = queries
+
+    @property
+    def count(self):
+        return len(self.queries)
+
+    def groups(self):
+        groups = {}
+        for query in self.queries:
+            group = groups.setdefault(query['normalized'], QueryGroup(query['normalized']))
+            group.count += 1
+            group.sources[query['source']] += 1
+        return sorted(groups.values(), key=lambda group: -group.count)
+
+    def repeated(self, threshold=DEFAULT_REPEAT_THRESHOLD):
+        """Groups executed at least threshold times: the per-row (N+1) patterns."""
+        return [group for group in self.groups() if group.count >= threshold]
+
+    def format(self, threshold=DEFAULT_REPEAT_THRESHOLD):
+        lines = [f'{self.count} queries']
+        for group in self.repeated(threshold):
+            sources = ', '.join(f'{source} (x{count})' for source, count in group.sources.most_common())
+            lines.append(f'  repeated x{group.count}: {group.sql}')
+            lines.append(f'    triggered by {sources}')
+        return '\n'.join(lines)
+
+
+class QueryCapture:
+    """Context manager recording every query on every database connection in this thread."""
+
+    def __init__(self):
+        self.queries = []
+        self._wrappers = []
+
+    def __call__(self, execute, sql, params, many, context):
+        self.queries.append({
+            'alias': context['connection'].alias,
+            'sql': sql,
+            'normalized': normalize_sql(sql),
+            'source': _query_source(sys._getframe(1)),
+        })
+        return execute(sql, params, many, context)
+
+    def __enter__(self):
+        for connection in connections.all():
+            wrapper = connection.execute_wrapper(self)
+            wrapper.__enter__()
+            self._wrappers.append(wrapper)
+        return self
+
+    def __exit__(self, *exc_info):
+        while self._wrappers:
+            self._wrappers.pop().__exit__(*exc_info)
+
+    @property
+    def report(self):
+        return QueryReport(self.queries)
+
+
+def check_query_budget(report, budget, label='request'):
+    """Raise QueryBudgetExceeded with the grouped report if report exceeds budget."""
+    if budget is not None and report.count > budget:
+        raise QueryBudgetExceeded(f'{label} ran {report.count} queries, budget is {budget}\n{report.format()}')
@@ -0,0 +1,171 @@
+"""
+Index advice for Orange Sherbert CRUD views.
+
+Every CRUDView declares the columns its list and formset queries filter, sort and search on.
+This module collects those columns for each view registered in the URLconf and checks them
+against the indexes the models already declare. See the `sherbert_indexes` management command.
+"""
+
+from collections import namedtuple
+
+from django.db import models
+from django.urls import URLPattern, URLResolver, get_resolver
+
+from orange_sherbert.filters import get_filter_specs
+from orange_sherbert.pagination import resolve_field
+
+# Filters that compare for equality, so an index on (filter, sort) can return rows already sorted
+EQUALITY_FILTER_TYPES = ('exact', 'multi', 'boolean')
+MAX_COMPOSITES = 4
+
+# kind is 'filter', 'sort', 'search', 'inline' or 'composite'; columns are field names on model
+IndexCandidate = namedtuple('IndexCandidate', ['view', 'model', 'columns', 'kind', 'indexed'])
+
+
+def iter_crud_views(urlconf=None):
+    """Yield every CRUDView subclass routed by the URLconf, once each."""
+    from orange_sherbert.view import CRUDView
+
+    seen = set()
+
+    def walk(patterns):
+        for pattern in patterns:
+            if isinstance(pattern, URLResolver):
+                yield from walk(pattern.url_patterns)
+            elif isinstance(pattern, URLPattern):
+                view_class = getattr(pattern.callback, 'view_class', None)
+                if view_class is not None and issubclass(view_class, CRUDView) and view_class not in seen:
+                    seen.add(view_class)
+                    yield view_class
+
+    yield from walk(get_resolver(urlconf).url_patterns)
+
+
+def _column(model, lookup):
+    """Return (model, field name) for the column a lookup ends on, or None for non-concrete lookups."""
+    field = resolve_field(model, lookup)
+    if field is None or not field.concrete or field.many_to_many:
+        return None
+    return field.model._meta.concrete_model, field.name
+
+
+def get_sort_columns(view_class):
+    model = view_class.model
+    if view_class.fields == '__all__':
+        names = [field.name for field in model._meta.fields if not field.primary_key]
+    else:
+        names = list(view_class.fields)
+    lookups = [view_class.property_field_map.get(name, name) for name in names]
+    lookups += [entry.lstrip('-') for entry in model._meta.ordering if isinstance(entry, str)]
+    return lookups
+
+
+def get_inline_columns(view_class):
+    """The foreign keys inline formsets look children up by (WHERE child.parent_id = ...)."""
+    columns = []
+    for config in view_class.inline_formsets:
+        parent = config.get('nested_under') or view_class.model
+        for field in config['model']._meta.fields:
+            if field.many_to_one and issubclass(parent, field.related_model):
+                columns.append((config['model'], field.name))
+                break
+    return columns
+
+
+def covers(index_fields, columns):
+    return tuple(index_fields[:len(columns)]) == tuple(columns)
+
+
+def get_model_indexes(model):
+    """Field lists of every index the model declares, leading column first."""
+    opts = model._meta
+    indexes = [[field.name] for field in opts.fields if field.primary_key or field.unique or field.db_index]
+    indexes += [[name.lstrip('-') for name in index.fields] for index in opts.indexes if index.fields]
+    indexes += [list(fields) for fields in opts.unique_together]
+    indexes += [
+        list(constraint.fields) for constraint in opts.constraints
+        if isinstance(constraint, models.UniqueConstraint) and constraint.fields and constraint.condition is None
+    ]
+    return indexes
+
+
+def is_indexed(model, columns):
+    return any(covers(index, columns) for index in get_model_indexes(model))
+
+
+def get_index_candidates(view_class, composites=True):
+    """
+    Return an IndexCandidate for each column view_class can query on, plus up to MAX_COMPOSITES
+    (equality filter, sort) pairs, ranked by the sort column: model ordering first, then list columns.
+    """
+    model = view_class.model
+    candidates = []
+    seen = set()
+
+    def add(target, columns, kind):
+        key = (target, tuple(columns))
+        if key in seen:
+            return
+        seen.add(key)
+        # icontains searches can't use a btree index, so they are reported but never "indexed"
+        indexed = False if kind == 'search' else is_indexed(target, columns)
+        candidates.append(IndexCandidate(view_class, target, tuple(columns), kind, indexed))
+
+    filters = [_column(model, lookup) for lookup in view_class.filter_fields]
+    sorts = [_column(model, lookup) for lookup in get_sort_columns(view_class)]
+
+    for column in filters:
+        if column:
+            add(column[0], [column[1]], 'filter')
+    for column in sorts:
+        if column:
+            add(column[0], [column[1]], 'sort')
+    for lookup in view_class.search_fields:
+        column = _column(model, lookup)
+        if column:
+            add(column[0], [column[1]], 'search')
+    for target, name in get_inline_columns(view_class):
+        add(target, [name], 'inline')
+
+    if composites:
+        # A range filter leading the index leaves rows out of sort order, so only equality filters pair up
+        equality = [
+            _column(model, spec.name) for spec in get_filter_specs(model, view_class.filter_fields)
+            if spec.type in EQUALITY_FILTER_TYPES
+        ]
+        equality = [column for column in equality if column and column[0] is model]
+        ordering = [_column(model, entry.lstrip('-')) for entry in model._meta.ordering if isinstance(entry, str)]
+        ranked = list(dict.fromkeys(column for column in ordering + sorts if column and column[0] is model))
+        pairs = [
+            (filter_column, sort_column) for sort_column in ranked for filter_column in equality
+            if sort_column not in equality
+        ]
+        for filter_column, sort_column in pairs[:MAX_COMPOSITES]:
+            add(model, [filter_column[1], sort_column[1]], 'composite')
+
+    return candidates
+
+
+def get_missing_indexes(urlconf=None, composites=True):
+    """
+    Unindexed filter/sort/inline/composite candidates across every routed CRUDView, deduplicated.
+    A candidate is dropped when a composite suggested for the same model starts with its columns.
+    """
+    missing = {}
+    for view_class in iter_crud_views(urlconf):
+        for candidate in get_index_candidates(view_class, composites):
+            if not candidate.indexed and candidate.kind != 'search':
+                missing.setdefault((candidate.model, candidate.columns), candidate)
+    return [
+        candidate for candidate in missing.values()
+        if not any(
+            model is candidate.model and columns != candidate.columns and covers(columns, candidate.columns)
+            for model, columns in missing
+        )
+    ]
+
+
+def build_index(model, columns):
+    index = models.Index(fields=list(columns))
+    index.set_name_with_model(model)
+    return index
@@ -0,0 +1,91 @@
+"""
+Per-phase timing for the CRUD request pipeline.
+
+Code in the pipeline marks phases with `phase('name')` (or the `timed('name')` decorator).
+Phases are only measured while a PhaseTimer is active for the current request or task;
+otherwise `phase()` returns a shared no-op context manager.
+"""
+
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from functools import wraps
+from time import perf_counter
+
+from django.db import connections
+
+_current_timer = ContextVar('orange_sherbert_phase_timer', default=None)
+_NO_PHASE = nullcontext()
+
+
+def phase(name):
+    timer = _current_timer.get()
+    if timer is None:
+        return _NO_PHASE
+    return timer.phase(name)
+
+
+def timed(name):
+    """Decorator that records every call of the function as the named phase."""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with phase(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class PhaseTimer:
+    """Collects wall time, query count and call count per phase for one request."""
+
+    def __init__(self):
+        self.phases = {}
+        self.queries = 0
+        self.total = 0.0
+        self._wrappers = []
+
+    def __call__(self, execute, sql, params, many, context):
+        self.queries += 1
+        return execute(sql, params, many, context)
+
+    def __enter__(self):
+        self._token = _current_timer.set(self)
+        for connection in connections.all():
+            wrapper = connection.execute_wrapper(self)
+            wrapper.__enter__()
+            self._wrappers.append(wrapper)
+        self._start = perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.total = perf_counter() - self._start
+        while self._wrappers:
+            self._wrappers.pop().__exit__(*exc_info)
+        _current_timer.reset(self._token)
+
+    @contextmanager
+    def phase(self, name):
+        start = perf_counter()
+        queries = self.queries
+        try:
+            yield
+        finally:
+            entry = self.phases.setdefault(name, [0.0, 0, 0])
+            entry[0] += perf_counter() - start
+            entry[1] += self.queries - queries
+            entry[2] += 1
+
+    def summary(self):
+        timings = [
+            {'name': name, 'duration_ms': duration * 1000, 'queries': queries, 'calls': calls}
+            for name, (duration, queries, calls) in self.phases.items()
+        ]
+        timings.append({'name': 'total', 'duration_ms': self.total * 1000, 'queries': self.queries, 'calls': 1})
+        return timings
+
+    def server_timing(self):
+        """Format the summary as a Server-Timing header value."""
+        return ', '.join(
+            f'{timing["name"]};dur={timing["duration_ms"]:.1f};desc="{timing["queries"]} queries"'
+            for timing in self.summary()
+        )
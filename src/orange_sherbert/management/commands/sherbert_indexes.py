@@ -0,0 +1,51 @@
+from django.core.management.base import BaseCommand
+
+from orange_sherbert.indexes import build_index, get_index_candidates, get_missing_indexes, iter_crud_views
+
+
+class Command(BaseCommand):
+    help = (
+        'List the filter, sort, search and inline lookup columns of every routed CRUDView, '
+        'report the ones without an index and print the Meta.indexes entries that would add them.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--urlconf', help='URLconf to discover CRUDViews from (default: ROOT_URLCONF).')
+        parser.add_argument(
+            '--no-composites', action='store_false', dest='composites',
+            help='Skip composite (filter, sort) index suggestions.',
+        )
+
+    def handle(self, *args, urlconf=None, composites=True, **options):
+        for view_class in iter_crud_views(urlconf):
+            self.stdout.write(self.style.MIGRATE_HEADING(f'{view_class.__module__}.{view_class.__name__}'))
+            for candidate in get_index_candidates(view_class, composites):
+                columns = ', '.join(candidate.columns)
+                label = f'  {candidate.kind:<9} {candidate.model._meta.label}({columns})'
+                if candidate.kind == 'search':
+                    self.stdout.write(f'{label}  icontains: needs a trigram/full-text index')
+                elif candidate.indexed:
+                    self.stdout.write(f'{label}  {self.style.SUCCESS("indexed")}')
+                else:
+                    self.stdout.write(f'{label}  {self.style.WARNING("missing")}')
+
+        missing = get_missing_indexes(urlconf, composites)
+        if not missing:
+            self.stdout.write(self.style.SUCCESS('No missing indexes.'))
+            return
+
+        by_model = {}
+        for candidate in missing:
+            by_model.setdefault(candidate.model, []).append(build_index(candidate.model, candidate.columns))
+
+        self.stdout.write(self.style.MIGRATE_HEADING('Suggested Meta.indexes'))
+        for model, indexes in by_model.items():
+            self.stdout.write(f'  {model._meta.label}:')
+            for index in indexes:
+                self.stdout.write(f'    models.Index(fields={index.fields!r}, name={index.name!r}),')
+
+        # No migration is written here: one that isn't mirrored in Meta.indexes is undone by the
+        # RemoveIndex the next makemigrations generates
+        self.stdout.write(
+            "Add these entries to each model's Meta.indexes, then run makemigrations to create the indexes."
+        )
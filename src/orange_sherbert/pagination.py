@@ -0,0 +1,186 @@
+"""
+Keyset (cursor) pagination helpers for Orange Sherbert list views.
+
+A cursor records the ordering values of the last row sent to the client, so the
+next chunk is fetched with a WHERE clause on those values instead of an OFFSET.
+Every ordering ends with the primary key, which makes the order total and stable.
+"""
+
+from functools import reduce
+from operator import or_
+
+from django.core import signing
+from django.core.exceptions import FieldDoesNotExist, SuspiciousOperation, ValidationError
+from django.db.models import F, Q
+
+CURSOR_SALT = 'orange_sherbert.cursor'
+# Relations followed through related models' Meta.ordering before giving up on a cursor
+MAX_RELATION_DEPTH = 5
+
+
+def resolve_field(model, name):
+    """Return the model field a lookup path (ordering, filter or API column) ends on, or None if it is not a plain field path."""
+    if name == 'pk':
+        return model._meta.pk
+    parts = name.split('__')
+    try:
+        for part in parts[:-1]:
+            model = model._meta.get_field(part).related_model
+            if model is None:
+                return None
+        if parts[-1] == 'pk':
+            return model._meta.pk
+        return model._meta.get_field(parts[-1])
+    except FieldDoesNotExist:
+        return None
+
+
+def _expand_key(model, name, descending, nullable=False, depth=0):
+    """
+    Keys that order like `name` does in order_by(), or None if a cursor can't resume that ordering.
+
+    A relation orders by the related model's Meta.ordering, as Django does, so ?sort=author pages
+    through authors by name; without one it is compared on its column (author -> author_id).
+    """
+    field = resolve_field(model, name)
+    if field is None or not field.concrete or depth > MAX_RELATION_DEPTH:
+        return None
+    nullable = nullable or field.null
+    if field.is_relation:
+        related_ordering = field.related_model._meta.ordering
+        if related_ordering:
+            keys = []
+            for entry in related_ordering:
+                if not isinstance(entry, str) or entry == '?':
+                    return None
+                related_keys = _expand_key(
+                    model, f"{name}__{entry.lstrip('-')}", descending != entry.startswith('-'), nullable, depth + 1,
+                )
+                if related_keys is None:
+                    return None
+                keys += related_keys
+            return keys
+        name = '__'.join(name.split('__')[:-1] + [field.attname])
+    return [(name, descending, nullable)]
+
+
+def get_keyset_keys(queryset):
+    """
+    Return the queryset's ordering as a list of (lookup, descending, nullable) keys ending on pk.
+
+    Relations expand to the related model's ordering (see _expand_key). Orderings that are not plain
+    field paths (expressions, random) can't be resumed from a cursor, so they fall back to pk.
+    """
+    model = queryset.model
+    query = queryset.query
+    ordering = query.order_by or (model._meta.ordering if query.default_ordering else ())
+
+    keys = []
+    for entry in ordering:
+        if not isinstance(entry, str) or entry == '?':
+            return [('pk', False, False)]
+        descending = entry.startswith('-')
+        name = entry.lstrip('-')
+        field = resolve_field(model, name)
+        if field is not None and field.primary_key and '__' not in name:
+            keys.append(('pk', descending, False))
+            return keys
+        entry_keys = _expand_key(model, name, descending)
+        if entry_keys is None:
+            return [('pk', False, False)]
+        keys += entry_keys
+
+    keys.append(('pk', False, False))
+    return keys
+
+
+def keyset_order_by(keys):
+    """Order expressions for keys; nullable columns sort NULLs last on every backend."""
+    order_by = []
+    for name, descending, nullable in keys:
+        nulls_last = True if nullable else None
+        order_by.append(F(name).desc(nulls_last=nulls_last) if descending else F(name).asc(nulls_last=nulls_last))
+    return order_by
+
+
+def keyset_filter(keys, values):
+    """Build the Q matching every row that sorts after the row with the given key values."""
+    terms = []
+    equal = Q()
+    for (name, descending, nullable), value in zip(keys, values):
+        if value is not None:
+            after = Q(**{f'{name}__lt' if descending else f'{name}__gt': value})
+            if nullable:
+                after |= Q(**{f'{name}__isnull': True})
+            terms.append(equal & after)
+        equal &= Q(**{f'{name}__isnull': True}) if value is None else Q(**{name: value})
+    return reduce(or_, terms)
+
+
+def _row_value(obj, name):
+    # values() rows are dicts keyed by the full lookup
+    if isinstance(obj, dict):
+        return obj.get(name)
+    for part in name.split('__'):
+        if obj is None:
+            return None
+        obj = getattr(obj, part)
+    return obj
+
+
+def encode_cursor(keys, obj):
+    """Sign the key values of obj into an opaque cursor string."""
+    values = [_row_value(obj, name) for name, _, _ in keys]
+    return signing.dumps({
+        'keys': [name for name, _, _ in keys],
+        'values': [None if value is None else str(value) for value in values],
+    }, salt=CURSOR_SALT, compress=True)
+
+
+def decode_cursor(model, keys, cursor):
+    """Return the typed key values stored in cursor, rejecting tampered or mismatched cursors."""
+    try:
+        payload = signing.loads(cursor, salt=CURSOR_SALT)
+    except signing.BadSignature:
+        raise SuspiciousOperation('Invalid list cursor.')
+    if payload.get('keys') != [name for name, _, _ in keys]:
+        raise SuspiciousOperation('List cursor does not match the current ordering.')
+
+    values = []
+    for name, value in zip(payload['keys'], payload['values']):
+        if value is None:
+            values.append(None)
+            continue
+        try:
+            values.append(resolve_field(model, name).to_python(value))
+        except ValidationError:
+            raise SuspiciousOperation('Invalid list cursor.')
+    return values
+
+
+def _chunk_queryset(queryset, size, cursor):
+    keys = get_keyset_keys(queryset)
+    queryset = queryset.order_by(*keyset_order_by(keys))
+    if cursor:
+        queryset = queryset.filter(keyset_filter(keys, decode_cursor(queryset.model, keys, cursor)))
+    # Fetch one extra row to learn whether another chunk exists without a COUNT
+    return keys, queryset[:size + 1]
+
+
+def _split_chunk(keys, rows, size):
+    if len(rows) <= size:
+        return rows, None
+    rows = rows[:size]
+    return rows, encode_cursor(keys, rows[-1])
+
+
+def get_keyset_chunk(queryset, size, cursor=None):
+    """Return (rows, next_cursor) for the chunk of at most size rows after cursor."""
+    keys, queryset = _chunk_queryset(queryset, size, cursor)
+    return _split_chunk(keys, list(queryset), size)
+
+
+async def aget_keyset_chunk(queryset, size, cursor=None):
+    """Async version of get_keyset_chunk()."""
+    keys, queryset = _chunk_queryset(queryset, size, cursor)
+    return _split_chunk(keys, [row async for row in queryset.aiterator()], size)
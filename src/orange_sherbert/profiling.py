@@ -0,0 +1,213 @@
+"""
+On-demand cProfile capture for CRUD requests.
+
+Add the middleware after AuthenticationMiddleware and include the download URLs:
+
+    MIDDLEWARE = [..., 'orange_sherbert.profiling.CRUDProfilingMiddleware']
+    urlpatterns = [..., *get_profiling_urls()]
+
+An authorised user requests any CRUD page with `?_profile=1` (or an `X-Sherbert-Profile: 1`
+header). The response carries an `X-Sherbert-Profile` header with the download URL. Append
+`?format=pstats` (for snakeviz/pstats), `collapsed` (for flamegraph.pl/speedscope) or `txt`.
+Without the download URLs `?_profile=1` is ignored, and the orange_sherbert.W002 check warns.
+
+Settings:
+    ORANGE_SHERBERT_PROFILE_PERMISSION  permission required to profile (default: superusers only)
+    ORANGE_SHERBERT_PROFILE_DIR         where profiles are stored (default: <tmp>/orange_sherbert_profiles)
+    ORANGE_SHERBERT_PROFILE_MAX_FILES   profiles kept; older ones are deleted (default: 50)
+
+Only one request is profiled at a time: Python allows a single active profiler per process, so
+a `?_profile=1` request that arrives while another is being profiled is served unprofiled.
+"""
+
+import cProfile
+import io
+import os
+import pstats
+import re
+import sys
+import tempfile
+import threading
+from uuid import uuid4
+
+from django.conf import settings
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseForbidden
+from django.urls import NoReverseMatch, Resolver404, path, resolve, reverse
+
+PROFILE_HEADER = 'X-Sherbert-Profile'
+PROFILE_ID = re.compile(r'^[0-9a-f]{32}$')
+MAX_STACK_DEPTH = 64
+MIN_STACK_SECONDS = 1e-6
+DEFAULT_MAX_FILES = 50
+
+_profiler_lock = threading.Lock()
+
+
+def get_profile_dir():
+    directory = getattr(
+        settings, 'ORANGE_SHERBERT_PROFILE_DIR', os.path.join(tempfile.gettempdir(), 'orange_sherbert_profiles'),
+    )
+    os.makedirs(directory, exist_ok=True)
+    return directory
+
+
+def prune_profiles(directory, keep):
+    """Delete the oldest profiles beyond ORANGE_SHERBERT_PROFILE_MAX_FILES, never the one just written (keep)"""
+    max_files = getattr(settings, 'ORANGE_SHERBERT_PROFILE_MAX_FILES', DEFAULT_MAX_FILES)
+    with os.scandir(directory) as entries:
+        profiles = [entry for entry in entries if entry.name.endswith('.pstats') and entry.is_file()]
+    profiles.sort(key=lambda entry: (entry.name == keep, entry.stat().st_mtime), reverse=True)
+    for entry in profiles[max_files:]:
+        try:
+            os.remove(entry.path)
+        except FileNotFoundError:
+            pass  # Pruned by a concurrent request
+
+
+def can_profile(user):
+    if user is None:
+        return False
+    permission = getattr(settings, 'ORANGE_SHERBERT_PROFILE_PERMISSION', None)
+    if permission:
+        return user.has_perm(permission)
+    return user.is_active and user.is_superuser
+
+
+def is_crud_request(request):
+    from orange_sherbert.view import CRUDView
+
+    try:
+        match = resolve(request.path_info)
+    except Resolver404:
+        return False
+    view_class = getattr(match.func, 'view_class', None)
+    return view_class is not None and issubclass(view_class, CRUDView) and view_class.allow_profiling
+
+
+class CRUDProfilingMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        requested = request.GET.get('_profile') or request.headers.get(PROFILE_HEADER)
+        if not requested or not can_profile(getattr(request, 'user', None)) or not is_crud_request(request):
+            return self.get_response(request)
+
+        profile_id = uuid4().hex
+        try:
+            download_url = reverse('orange_sherbert-profile', kwargs={'profile_id': profile_id})
+        except NoReverseMatch:
+            # get_profiling_urls() isn't included (check orange_sherbert.W002), so nothing could download it
+            return self.get_response(request)
+
+        if not _profiler_lock.acquire(blocking=False):
+            return self.get_response(request)
+        try:
+            profiler = cProfile.Profile()
+            try:
+                profiler.enable()
+            except ValueError:
+                # Another profiler (a debugger, coverage) already holds the interpreter's hook
+                return self.get_response(request)
+            try:
+                response = self.get_response(request)
+                # Include template rendering, which otherwise happens after the middleware returns
+                if hasattr(response, 'render') and callable(response.render):
+                    response.render()
+            finally:
+                profiler.disable()
+        finally:
+            _profiler_lock.release()
+
+        directory = get_profile_dir()
+        profiler.dump_stats(os.path.join(directory, f'{profile_id}.pstats'))
+        prune_profiles(directory, keep=f'{profile_id}.pstats')
+        response[PROFILE_HEADER] = download_url
+        return response
+
+
+def _module_name(filename):
+    """Map a source file to its dotted module name (e.g. orange_sherbert.view) where possible."""
+    for entry in sorted((p for p in sys.path if p), key=len, reverse=True):
+        entry = os.path.abspath(entry)
+        if filename.startswith(entry + os.sep):
+            module = os.path.splitext(filename[len(entry) + 1:])[0].replace(os.sep, '.')
+            return module.removesuffix('.__init__')
+    return os.path.basename(filename)
+
+
+def _label(func):
+    filename, lineno, name = func
+    if filename == '~':
+        return name
+    return f'{_module_name(filename)}:{name}:{lineno}'
+
+
+def collapsed_stacks(stats):
+    """
+    Convert pstats data to collapsed stacks ("a;b;c microseconds" per line) for flame graphs.
+
+    cProfile records caller/callee edges rather than full stacks, so each function's own time
+    is spread over the paths reaching it in proportion to the time spent through each edge.
+    """
+    entries = stats.stats
+    children = {}
+    for func, (_, _, _, _, callers) in entries.items():
+        for caller, caller_stats in callers.items():
+            children.setdefault(caller, []).append((func, caller_stats[3]))
+    roots = [func for func, entry in entries.items() if not entry[4]]
+
+    lines = {}
+
+    def walk(func, stack, share):
+        _, _, tottime, cumtime, _ = entries[func]
+        stack = stack + [_label(func)]
+        own = tottime * share
+        if own > 0:
+            key = ';'.join(stack)
+            lines[key] = lines.get(key, 0) + own
+        # Stop once a path carries under a microsecond; walking every path is exponential
+        if len(stack) >= MAX_STACK_DEPTH or cumtime * share < MIN_STACK_SECONDS:
+            return
+        for child, edge_cumtime in children.get(func, ()):
+            if _label(child) in stack:
+                continue
+            child_cumtime = entries[child][3]
+            if child_cumtime > 0:
+                walk(child, stack, share * min(edge_cumtime / child_cumtime, 1.0))
+
+    for root in roots:
+        walk(root, [], 1.0)
+    return '\n'.join(f'{stack} {round(seconds * 1_000_000)}' for stack, seconds in lines.items() if seconds >= MIN_STACK_SECONDS)
+
+
+def profile_view(request, profile_id):
+    if not can_profile(getattr(request, 'user', None)):
+        return HttpResponseForbidden('You do not have permission to download profiles.')
+    if not PROFILE_ID.match(profile_id):
+        raise Http404('Unknown profile')
+    filename = os.path.join(get_profile_dir(), f'{profile_id}.pstats')
+    if not os.path.exists(filename):
+        raise Http404('Unknown profile')
+
+    output_format = request.GET.get('format', 'txt')
+    if output_format == 'pstats':
+        return FileResponse(open(filename, 'rb'), as_attachment=True, filename=f'{profile_id}.pstats')
+    if output_format == 'collapsed':
+        response = HttpResponse(collapsed_stacks(pstats.Stats(filename)), content_type='text/plain')
+        response['Content-Disposition'] = f'attachment; filename="{profile_id}.collapsed"'
+        return response
+
+    report = io.StringIO()
+    stats = pstats.Stats(filename, stream=report).sort_stats('cumulative')
+    report.write('orange_sherbert functions\n')
+    stats.print_stats(r'orange_sherbert')
+    report.write('\nAll functions\n')
+    stats.print_stats(40)
+    return HttpResponse(report.getvalue(), content_type='text/plain')
+
+
+def get_profiling_urls(prefix='_sherbert/profiles/'):
+    return [
+        path(f'{prefix}<str:profile_id>/', profile_view, name='orange_sherbert-profile'),
+    ]
@@ -0,0 +1,6 @@
+from django.dispatch import Signal
+
+# Sent after an instrumented CRUD request is rendered.
+# Arguments: sender (the CRUDView subclass), request, view_type, timings
+# (list of {'name', 'duration_ms', 'queries', 'calls'} dicts, ending with 'total').
+crud_request_timed = Signal()
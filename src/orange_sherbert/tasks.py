@@ -0,0 +1,192 @@
+"""
+Background jobs for long-running Orange Sherbert actions and deletes.
+
+A job is a module-level function called as func(job, *args, **kwargs). Its status lives in
+the Django cache, so the page that started it can poll a progress fragment. Backends decide
+where the function runs:
+
+    ORANGE_SHERBERT_TASK_BACKEND = 'orange_sherbert.tasks.ThreadPoolTaskBackend'  # default
+    ORANGE_SHERBERT_TASK_BACKEND = 'orange_sherbert.tasks.ImmediateTaskBackend'   # run inline
+
+Other backends (Celery, RQ, ...) subclass BaseTaskBackend and call run_job() in a worker.
+Job status is shared through the cache, so multi-process deployments need a shared cache.
+
+Jobs reach those backends only once the current transaction commits, so a worker never runs
+before the rows it needs exist, or after a rollback (the job then stays 'pending').
+ImmediateTaskBackend runs inside the transaction instead, and is rolled back with it.
+"""
+
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from uuid import uuid4
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections, transaction
+from django.utils.module_loading import import_string
+
+from orange_sherbert.deletion import DEFAULT_BATCH_SIZE, delete_in_batches
+
+JOB_KEY = 'orange_sherbert:job:{job_id}'
+DEFAULT_BACKEND = 'orange_sherbert.tasks.ThreadPoolTaskBackend'
+
+logger = logging.getLogger('orange_sherbert.tasks')
+
+_backends = {}
+_backends_lock = threading.Lock()
+
+
+def _job_timeout():
+    return getattr(settings, 'ORANGE_SHERBERT_JOB_TIMEOUT', 60 * 60 * 24)
+
+
+def get_job(job_id):
+    """Return the status dict of a job, or None if it is unknown or expired."""
+    return cache.get(JOB_KEY.format(job_id=job_id))
+
+
+def _save_job(record):
+    cache.set(JOB_KEY.format(job_id=record['id']), record, _job_timeout())
+
+
+class Job:
+    """Handle passed to job functions for reporting progress."""
+
+    def __init__(self, job_id):
+        self.id = job_id
+
+    def update(self, **fields):
+        record = get_job(self.id) or {'id': self.id}
+        record.update(fields)
+        _save_job(record)
+
+    def progress(self, done, total=None, message=None):
+        self.update(done=done, total=total, message=message or '')
+
+
+def run_job(job_id, func_path, args, kwargs):
+    """Run a queued job and record its outcome; the entry point for every backend."""
+    job = Job(job_id)
+    job.update(status='running')
+    try:
+        result = import_string(func_path)(job, *args, **kwargs)
+    except Exception as exc:
+        logger.exception('Job %s (%s) failed', job_id, func_path)
+        job.update(status='failed', message=str(exc))
+        raise
+    else:
+        # A string result becomes the final message shown to the user
+        if isinstance(result, str):
+            job.update(status='done', message=result)
+        else:
+            job.update(status='done')
+    finally:
+        # Worker threads open their own connections; don't leave them behind
+        if threading.current_thread() is not threading.main_thread():
+            connections.close_all()
+
+
+class BaseTaskBackend:
+    run_after_commit = True
+
+    def enqueue(self, job_id, func_path, args, kwargs):
+        raise NotImplementedError('Task backends must implement enqueue()')
+
+
+class ImmediateTaskBackend(BaseTaskBackend):
+    """Runs jobs inline in the request; for tests and development."""
+    run_after_commit = False
+
+    def enqueue(self, job_id, func_path, args, kwargs):
+        try:
+            run_job(job_id, func_path, args, kwargs)
+        except Exception:
+            pass  # Recorded on the job as 'failed'
+
+
+class ThreadPoolTaskBackend(BaseTaskBackend):
+    """Runs jobs in a thread pool inside the web process. Jobs are lost if the process exits."""
+
+    def __init__(self, max_workers=None):
+        max_workers = max_workers or getattr(settings, 'ORANGE_SHERBERT_TASK_WORKERS', 4)
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='orange_sherbert')
+
+    def enqueue(self, job_id, func_path, args, kwargs):
+        self.executor.submit(run_job, job_id, func_path, args, kwargs)
+
+
+def get_task_backend():
+    backend_path = getattr(settings, 'ORANGE_SHERBERT_TASK_BACKEND', DEFAULT_BACKEND)
+    with _backends_lock:
+        if backend_path not in _backends:
+            _backends[backend_path] = import_string(backend_path)()
+        return _backends[backend_path]
+
+
+def get_task_path(func):
+    """Dotted import path of a job function (or the path itself)."""
+    return func if isinstance(func, str) else f'{func.__module__}.{func.__qualname__}'
+
+
+def enqueue_job(func, *args, label='', user=None, session_key=None, redirect=None, scope=None, commit_using=None, **kwargs):
+    """
+    Queue func(job, *args, **kwargs) on the configured backend and return its job id.
+
+    func must be importable (a module-level function or its dotted path) so out-of-process
+    backends can run it. user limits who may poll the job, or session_key for anonymous users;
+    redirect is offered once it is done. scope names the CRUD view whose jobs URL serves it
+    (None: any). The job is handed to the backend when commit_using's transaction commits.
+    """
+    job_id = uuid4().hex
+    _save_job({
+        'id': job_id,
+        'status': 'pending',
+        'label': label,
+        'user': getattr(user, 'pk', None),
+        'session_key': session_key,
+        'redirect': redirect,
+        'scope': scope,
+        'done': 0,
+        'total': None,
+        'message': '',
+    })
+    backend = get_task_backend()
+    func_path = get_task_path(func)
+    if backend.run_after_commit:
+        transaction.on_commit(lambda: backend.enqueue(job_id, func_path, args, kwargs), using=commit_using)
+    else:
+        backend.enqueue(job_id, func_path, args, kwargs)
+    return job_id
+
+
+def is_job_owner(job, request):
+    """Whether request may see job: its user, or for anonymous jobs the session that started it"""
+    if request.user.is_superuser:
+        return True
+    if job['user'] is not None:
+        return job['user'] == request.user.pk
+    session_key = job.get('session_key')
+    return session_key is not None and session_key == request.session.session_key
+
+
+def delete_task(job, model_label, pk, batch_size=DEFAULT_BATCH_SIZE, using=None):
+    """Job: delete one object and its cascades in batches."""
+    from orange_sherbert.view import invalidate_cached_counts
+
+    model = apps.get_model(model_label)
+    queryset = model._base_manager.using(using).filter(pk=pk)
+    deleted = delete_in_batches(
+        queryset, batch_size,
+        progress=lambda done, total, label: job.progress(done, total, f'Deleting {label}'),
+    )
+    invalidate_cached_counts(model)
+    return f'Deleted {deleted} rows.'
+
+
+def action_task(job, model_label, pk, task_path, using=None):
+    """Job: run an extra action's 'task' callable as task(job, obj)."""
+    model = apps.get_model(model_label)
+    obj = model._base_manager.using(using).get(pk=pk)
+    return import_string(task_path)(job, obj)
@@ -1,24 +1,25 @@
 from django import template
+from orange_sherbert.instrumentation import timed
+from orange_sherbert.pagination import resolve_field
 
 register = template.Library()
 
 
 @register.simple_tag
+@timed('field_options')
 def get_field_options(obj, field_name):
     model = obj.model
+    # Read options from the same database as the list itself (e.g. a read replica)
+    objects = model.objects.using(getattr(obj, 'db', None))
     
     if '__' in field_name:
-        parts = field_name.split('__')
-        current_model = model
-        for part in parts[:-1]:
-            rel_field = current_model._meta.get_field(part)
-            current_model = rel_field.related_model
-        field = current_model._meta.get_field(parts[-1])
+        # None for transforms such as pub_date__year, whose values have no choices
+        field = resolve_field(model, field_name)
         
-        distinct_values = model.objects.values_list(field_name, flat=True).distinct()
+        distinct_values = objects.values_list(field_name, flat=True).distinct()
         distinct_values = [v for v in distinct_values if v not in (None, '')]
         
-        if hasattr(field, 'choices') and field.choices:
+        if getattr(field, 'choices', None):
             choices_dict = dict(field.choices)
             return [(v, choices_dict.get(v, v)) for v in distinct_values]
         return [(v, v) for v in distinct_values]
@@ -27,19 +28,19 @@ def get_field_options(obj, field_name):
     
     if field.is_relation:
         related_model = field.related_model
-        related_ids = model.objects.values_list(field_name, flat=True).distinct()
+        related_ids = objects.values_list(field_name, flat=True).distinct()
         related_ids = [v for v in related_ids if v is not None]
-        related_objects = related_model.objects.filter(pk__in=related_ids)
+        related_objects = related_model.objects.using(objects.db).filter(pk__in=related_ids)
         return [(obj.pk, str(obj)) for obj in related_objects]
     
-    distinct_values = model.objects.values_list(field_name, flat=True).distinct().order_by(field_name)
+    distinct_values = objects.values_list(field_name, flat=True).distinct().order_by(field_name)
     return [(v, v) for v in distinct_values if v not in (None, '')]
 
 
 @register.simple_tag
 def is_selected(option, request, field):
-    current = request.GET.get(field, '')
-    return 'selected' if str(option) == str(current) else ''
+    # getlist() so multi-value filters mark every chosen option
+    return 'selected' if str(option) in request.GET.getlist(field) else ''
 
 
 @register.simple_tag
@@ -58,3 +59,11 @@ def get_verbose_name(obj, field_name):
         return field_name.replace('_', ' ').title()
 
 
+@register.filter
+def get_item(mapping, key):
+    """
+    Look up a key in a dict from a template.
+
+    Usage: {{ item.edit_urls|get_item:field_name }}
+    """
+    return mapping.get(key) if mapping else None
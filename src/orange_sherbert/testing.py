@@ -0,0 +1,54 @@
+"""
+Test helpers for Orange Sherbert CRUD views.
+
+Usage (pytest-django):
+
+    from orange_sherbert.testing import assert_crud_query_budget
+
+    def test_book_list_queries(client, books):
+        response, report = assert_crud_query_budget(client, '/book/', repeat_threshold=3)
+"""
+
+from urllib.parse import urlsplit
+
+from django.urls import resolve
+
+from orange_sherbert.diagnostics import QueryCapture, check_query_budget
+
+
+def crud_request(client, path, method='get', data=None, **extra):
+    """Issue a request through the test client and return (response, QueryReport)."""
+    with QueryCapture() as capture:
+        response = getattr(client, method.lower())(path, data, **extra)
+    return response, capture.report
+
+
+def get_crud_query_budget(path):
+    """Return the query_budget of the CRUDView serving path, or None."""
+    from orange_sherbert.view import CRUDView
+
+    match = resolve(urlsplit(path).path)
+    view_class = getattr(match.func, 'view_class', None)
+    if view_class is None or not issubclass(view_class, CRUDView):
+        return None
+    return view_class.get_query_budget(match.func.view_initkwargs.get('view_type', 'list'))
+
+
+def assert_no_repeated_queries(report, threshold):
+    """Fail if any normalised query ran threshold times or more (an N+1 pattern)."""
+    if report.repeated(threshold):
+        raise AssertionError(f'Repeated per-row queries detected\n{report.format(threshold)}')
+
+
+def assert_crud_query_budget(client, path, method='get', data=None, budget=None, repeat_threshold=None, **extra):
+    """
+    Request path and fail if it runs more queries than budget (default: the serving
+    CRUDView's query_budget) or, when repeat_threshold is given, repeats a query per row.
+    """
+    response, report = crud_request(client, path, method, data, **extra)
+    if budget is None:
+        budget = get_crud_query_budget(path)
+    check_query_budget(report, budget, f'{method.upper()} {path}')
+    if repeat_threshold is not None:
+        assert_no_repeated_queries(report, repeat_threshold)
+    return response, report
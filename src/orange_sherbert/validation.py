@@ -0,0 +1,220 @@
+"""
+Batched validation for Orange Sherbert inline formset trees.
+
+Django validates each inline form on its own. Every ModelChoiceField, including the hidden pk
+of each existing row, runs a SELECT. The model then re-checks each foreign key with an EXISTS,
+and every unique field or unique_together set runs its own query. With hundreds of nested rows
+that is hundreds of queries before anything is saved.
+
+validate_formset_level() validates every formset at one depth of the tree together. Submitted
+choice values are resolved with one IN query per field, and unique checks run as one query per
+model and field set. The results are then handed back to the forms.
+"""
+
+from collections import defaultdict
+from functools import reduce
+from operator import or_
+
+from django import forms
+from django.core.exceptions import NON_FIELD_ERRORS, EmptyResultSet, FieldDoesNotExist, ValidationError
+from django.db import connections, models
+from django.db.models import Q
+from django.forms.utils import ErrorDict
+
+
+def _lookup_key(field, value):
+    """Normalised string form of a choice value, so '7', 7 and the object's own key compare equal"""
+    opts = field.queryset.model._meta
+    model_field = opts.get_field(field.to_field_name) if field.to_field_name else opts.pk
+    return str(model_field.to_python(value))
+
+
+class BatchedModelChoiceField(forms.ModelChoiceField):
+    """A ModelChoiceField that resolves its value from objects prefetched for the whole level"""
+    prefetched = None
+
+    def to_python(self, value):
+        if self.prefetched is None or value in self.empty_values:
+            return super().to_python(value)
+        if isinstance(value, self.queryset.model):
+            value = getattr(value, self.to_field_name or 'pk')
+        try:
+            obj = self.prefetched.get(_lookup_key(self, value))
+        except ValidationError:
+            obj = None
+        if obj is None:
+            raise ValidationError(
+                self.error_messages['invalid_choice'],
+                code='invalid_choice',
+                params={'value': value},
+            )
+        return obj
+
+
+def batched_formfield(field, **kwargs):
+    """formfield_callback that gives foreign keys a BatchedModelChoiceField"""
+    if isinstance(field, models.ForeignKey):
+        kwargs.setdefault('form_class', BatchedModelChoiceField)
+    return field.formfield(**kwargs)
+
+
+class BatchedModelForm(forms.ModelForm):
+    """
+    Inline form whose database checks can be left to validate_formset_level(). Unique checks
+    are collected instead of queried. Foreign keys that a prefetched BatchedModelChoiceField
+    already resolved skip the model's own EXISTS check.
+    """
+    defer_db_checks = False
+
+    def get_resolved_foreign_keys(self):
+        resolved = set()
+        for name, field in self.fields.items():
+            if isinstance(field, BatchedModelChoiceField) and field.prefetched is not None:
+                try:
+                    model_field = self._meta.model._meta.get_field(name)
+                except FieldDoesNotExist:
+                    continue
+                if model_field.many_to_one:
+                    resolved.add(name)
+        return resolved
+
+    def _get_validation_exclusions(self):
+        # Used by _post_clean for the model's full_clean(); unique and constraint checks below
+        # keep the full field set
+        return super()._get_validation_exclusions() | self.get_resolved_foreign_keys()
+
+    def validate_unique(self):
+        exclude = super()._get_validation_exclusions()
+        if not self.defer_db_checks:
+            try:
+                self.instance.validate_unique(exclude=exclude)
+            except ValidationError as e:
+                self._update_errors(e)
+            return
+        unique_checks, date_checks = self.instance._get_unique_checks(exclude=exclude)
+        self.deferred_unique_checks = unique_checks
+        errors = self.instance._perform_date_checks(date_checks)
+        if errors:
+            self._update_errors(ValidationError(errors))
+
+    def validate_constraints(self):
+        try:
+            self.instance.validate_constraints(exclude=super()._get_validation_exclusions())
+        except ValidationError as e:
+            self._update_errors(e)
+
+    def add_unique_error(self, model_class, unique_check):
+        key = unique_check[0] if len(unique_check) == 1 and unique_check[0] in self.fields else NON_FIELD_ERRORS
+        self._update_errors(ValidationError({key: [self.instance.unique_error_message(model_class, unique_check)]}))
+
+
+def _queryset_key(queryset):
+    """Identifies a queryset's rows, so fields narrowed per form (by user, by parent) aren't pooled"""
+    try:
+        return queryset.db, str(queryset.query)
+    except EmptyResultSet:
+        return queryset.db, None
+
+
+def prefetch_choices(form_list):
+    """
+    Resolve every BatchedModelChoiceField's submitted values across forms with one IN query per
+    field and queryset; forms that narrow a field's queryset in __init__ get their own query.
+    """
+    groups = defaultdict(list)
+    for form in form_list:
+        for name, field in form.fields.items():
+            if isinstance(field, BatchedModelChoiceField):
+                value = field.widget.value_from_datadict(form.data, form.files, form.add_prefix(name))
+                groups[(type(form), name, _queryset_key(field.queryset))].append((field, value))
+
+    for entries in groups.values():
+        field = entries[0][0]
+        keys = set()
+        for _, value in entries:
+            if value in field.empty_values:
+                continue
+            try:
+                keys.add(_lookup_key(field, value))
+            except ValidationError:
+                pass  # Reported as an invalid choice by the field itself
+        prefetched = {}
+        if keys:
+            lookup = field.to_field_name or 'pk'
+            for obj in field.queryset.filter(**{f'{lookup}__in': keys}):
+                prefetched[_lookup_key(field, getattr(obj, lookup))] = obj
+        for entry_field, _ in entries:
+            entry_field.prefetched = prefetched
+
+
+def check_unique(form_list):
+    """Run the unique checks forms deferred as one query per model and field set; False if any failed"""
+    groups = defaultdict(list)
+    for form in form_list:
+        instance = form.instance
+        for model_class, unique_check in getattr(form, 'deferred_unique_checks', ()):
+            values = []
+            for name in unique_check:
+                model_field = instance._meta.get_field(name)
+                value = getattr(instance, model_field.attname)
+                empty_is_null = value == '' and connections[instance._state.db or 'default'].features.interprets_empty_strings_as_nulls
+                # Same skips as Model._perform_unique_checks()
+                if value is None or empty_is_null or (model_field.primary_key and not instance._state.adding):
+                    break
+                values.append(value)
+            else:
+                groups[(model_class, unique_check)].append((form, tuple(values)))
+
+    valid = True
+    for (model_class, unique_check), entries in groups.items():
+        if len(unique_check) == 1:
+            condition = Q(**{f'{unique_check[0]}__in': {values[0] for _, values in entries}})
+        else:
+            condition = reduce(or_, (Q(**dict(zip(unique_check, values))) for values in {values for _, values in entries}))
+        attnames = [model_class._meta.get_field(name).attname for name in unique_check]
+        taken = defaultdict(set)
+        for pk, *values in model_class._default_manager.filter(condition).values_list('pk', *attnames):
+            taken[tuple(values)].add(pk)
+
+        for form, values in entries:
+            own_pk = None if form.instance._state.adding else form.instance._get_pk_val(model_class._meta)
+            if taken[values] - {own_pk}:
+                form.add_unique_error(model_class, unique_check)
+                valid = False
+    return valid
+
+
+def skip_validation(formset):
+    """Leave a formset unvalidated (fail-fast); it still renders, just without errors"""
+    for form in formset.forms:
+        form._errors = ErrorDict(renderer=form.renderer)
+        form.cleaned_data = {}
+        for child in getattr(form, 'children', []):
+            skip_validation(child)
+
+
+def validate_formset_level(formsets, fail_fast=False):
+    """
+    Validate formsets that sit at the same depth of the tree, batching their database checks.
+    With fail_fast, formsets after the first invalid one are left unvalidated.
+    """
+    level_forms = [form for formset in formsets for form in formset.forms]
+    prefetch_choices(level_forms)
+    for form in level_forms:
+        if isinstance(form, BatchedModelForm):
+            form.defer_db_checks = True
+
+    valid = True
+    validated = []
+    for formset in formsets:
+        if fail_fast and not valid:
+            skip_validation(formset)
+            continue
+        valid = formset.is_valid() and valid
+        validated.append(formset)
+
+    checked = [
+        form for formset in validated for form in formset.forms
+        if not (formset.can_delete and formset._should_delete_form(form))
+    ]
+    return check_unique(checked) and valid
@@ -4,12 +4,67 @@ from django.views.generic import CreateView
 from django.views.generic import UpdateView
 from django.views.generic import DeleteView
 from django.views import View
-from django.urls import path, reverse
-from django.db.models import Q
-from django.http import HttpResponseForbidden, HttpResponse
+from django.urls import path, reverse, NoReverseMatch
+from django.db import connections, transaction
+from django.db.models.signals import post_delete, post_save
+from django.db.models import Avg, Count, DateTimeField, F, Max, Min, Q, Sum
+from django.db.models.functions import Now
+from django.http import HttpResponseForbidden, HttpResponse, HttpResponseRedirect, Http404
+from django.http import HttpResponseNotAllowed, JsonResponse, QueryDict, StreamingHttpResponse
 from django.template.loader import render_to_string
-from django.forms.models import BaseInlineFormSet
-from django.forms.models import inlineformset_factory
+from django.forms.models import BaseInlineFormSet, ModelChoiceField
+from django.forms.models import inlineformset_factory, model_to_dict
+from django.conf import settings
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.core.exceptions import FieldDoesNotExist, ImproperlyConfigured, PermissionDenied, ValidationError
+from asgiref.sync import sync_to_async
+from orange_sherbert.pagination import get_keyset_chunk, aget_keyset_chunk, get_keyset_keys, resolve_field
+from orange_sherbert.diagnostics import QueryCapture, logger as diagnostics_logger
+from orange_sherbert.instrumentation import PhaseTimer, phase, timed
+from orange_sherbert.deletion import get_cascade_summary
+from orange_sherbert.filters import BOOLEAN_CHOICES, NULL_CHOICES, check_filter_fields, get_filter_lookups, get_filter_specs, get_input_type
+from orange_sherbert.signals import crud_request_timed
+from orange_sherbert.validation import BatchedModelChoiceField, BatchedModelForm, batched_formfield, skip_validation, validate_formset_level
+from orange_sherbert.tasks import action_task, delete_task, enqueue_job, get_job, get_task_path, is_job_owner
+from contextlib import ExitStack
+from django.utils import timezone
+from django.utils.html import escape
+from django.utils.http import RFC3986_SUBDELIMS
+from decimal import Decimal
+from hashlib import md5
+import json
+from urllib.parse import quote
+from uuid import uuid4
+
+# Placeholder pks used to reverse a URL once per list page; the first one accepted
+# by the view's path converter is swapped for each row's real pk.
+PK_PLACEHOLDERS = ('__pk__', '987654321987654321', 'fedcba98-7654-3210-fedc-ba9876543210')
+
+ROW_VERSION_KEY = 'orange_sherbert:row:{label}:{pk}'
+COUNT_GENERATION_KEY = 'orange_sherbert:count-generation:{label}'
+COUNT_KEY = 'orange_sherbert:count:{label}:{generation}:{query}'
+AGGREGATE_KEY = 'orange_sherbert:aggregates:{label}:{generation}:{query}'
+AGGREGATE_FUNCTIONS = {'sum': Sum, 'avg': Avg, 'min': Min, 'max': Max, 'count': Count}
+
+# Set after a CRUD write so the same client reads its own changes from the primary
+PRIMARY_PIN_COOKIE = 'orange_sherbert_primary'
+API_CHUNK_SIZE = 2000
+VERSION_PARAM = '_version'
+MAX_SORT_KEYS = 3
+# Stand-ins for the prefix and index of cached empty inline forms (see render_empty_form)
+EMPTY_FORM_PREFIX = '__sherbert_prefix__'
+EMPTY_FORM_INDEX = '__sherbert_index__'
+_empty_form_html = {}
+API_VIEW_TYPES = {
+    ('api_list', 'GET'): 'list',
+    ('api_list', 'POST'): 'create',
+    ('api_detail', 'GET'): 'detail',
+    ('api_detail', 'POST'): 'update',
+    ('api_detail', 'PUT'): 'update',
+    ('api_detail', 'PATCH'): 'update',
+    ('api_detail', 'DELETE'): 'delete',
+}
 
 class NestedInlineFormSet(BaseInlineFormSet):
     parent_formset_name = None
@@ -22,7 +77,19 @@ class NestedInlineFormSet(BaseInlineFormSet):
             kwargs['queryset'] = self.model.objects.filter(**self.queryset_filter)
         super().__init__(*args, **kwargs)
 
+    def add_fields(self, form, index):
+        super().add_fields(form, index)
+        # Existing rows' hidden pks are then resolved in one query per tree level (see validation.py)
+        pk_name = self._pk_field.name
+        field = form.fields.get(pk_name)
+        if type(field) is ModelChoiceField:
+            form.fields[pk_name] = BatchedModelChoiceField(
+                field.queryset, initial=field.initial, required=False, widget=field.widget,
+            )
+
 def nestedinlineformset_factory(parent_model, model, parent_formset_name, queryset_filter=None, **kwargs):
+    kwargs.setdefault('form', BatchedModelForm)
+    kwargs.setdefault('formfield_callback', batched_formfield)
     FormSet = inlineformset_factory(
         parent_model,
         model,
@@ -33,6 +100,168 @@ def nestedinlineformset_factory(parent_model, model, parent_formset_name, querys
     FormSet.queryset_filter = queryset_filter
     return FormSet
 
+def row_version_key(model, pk):
+    return ROW_VERSION_KEY.format(label=model._meta.concrete_model._meta.label_lower, pk=pk)
+
+def invalidate_row_cache(instance):
+    """
+    Expire cached list cells for an instance, and for rows that show it through a foreign key.
+    Saves and deletes do this automatically; call it from custom views that write rows with
+    QuerySet.update() or raw SQL.
+    """
+    cache.set(row_version_key(type(instance), instance.pk), uuid4().hex, None)
+
+def get_row_cache_relations(model, fields):
+    """Forward relations among a list's columns; cells render the related row's __str__"""
+    relations = []
+    for field_name in fields:
+        try:
+            field = model._meta.get_field(field_name)
+        except FieldDoesNotExist:
+            continue
+        # Tokens are keyed by pk, so foreign keys to another column can't be tracked
+        if field.is_relation and field.concrete and not field.many_to_many and field.target_field.primary_key:
+            relations.append(field)
+    return relations
+
+# Models whose rows appear in cached list cells, directly or through a foreign key column
+_row_cached_models = set()
+
+def track_row_cache(model, relations):
+    _row_cached_models.add(model._meta.concrete_model)
+    _row_cached_models.update(field.related_model._meta.concrete_model for field in relations)
+
+def is_row_cached(model):
+    """Whether some cached list shows model's rows; QuerySet.update() writers must then call invalidate_row_cache()"""
+    return model._meta.concrete_model in _row_cached_models
+
+def _expire_cached_row(sender, instance, **kwargs):
+    if is_row_cached(sender):
+        invalidate_row_cache(instance)
+
+post_save.connect(_expire_cached_row, dispatch_uid='orange_sherbert_row_cache_save')
+post_delete.connect(_expire_cached_row, dispatch_uid='orange_sherbert_row_cache_delete')
+
+def is_static_form(form):
+    """
+    Whether an empty inline form (and the forms nested in it) renders the same for every user and
+    request: no <select> of database rows and no callable initial values or model defaults.
+    """
+    model = getattr(getattr(form, '_meta', None), 'model', None)
+    for name, field in form.fields.items():
+        if isinstance(field, ModelChoiceField) and not field.widget.is_hidden:
+            return False
+        if callable(form.initial.get(name, field.initial)):
+            return False
+        try:
+            model_field = model._meta.get_field(name) if model else None
+        except FieldDoesNotExist:
+            model_field = None
+        if getattr(model_field, 'concrete', False) and model_field.has_default() and callable(model_field.default):
+            return False
+    return all(
+        is_static_form(child_form)
+        for formset in getattr(form, 'children', [])
+        for child_form in formset.forms
+    )
+
+def invalidate_cached_counts(model):
+    """Expire cached list totals and footer aggregates for a model; call from custom views that write rows"""
+    cache.set(COUNT_GENERATION_KEY.format(label=model._meta.label_lower), uuid4().hex, None)
+
+def estimate_table_rows(model, using='default'):
+    """Return the backend's row estimate for a model's table, or None if it has none"""
+    connection = connections[using]
+    table = model._meta.db_table
+    if connection.vendor == 'postgresql':
+        # to_regclass() parses an identifier: quoted, so mixed-case names keep their case; NULL if missing
+        sql = 'SELECT reltuples FROM pg_class WHERE oid = to_regclass(%s)'
+        table = connection.ops.quote_name(table)
+    elif connection.vendor == 'mysql':
+        sql = 'SELECT table_rows FROM information_schema.tables WHERE table_schema = DATABASE() AND table_name = %s'
+    else:
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [table])
+        row = cursor.fetchone()
+    # Tables never analyzed report -1 on Postgres 14+ and 0 before it; an empty table costs
+    # nothing to count, so 0 falls back to the cached counter as well
+    if row is None or row[0] is None or row[0] <= 0:
+        return None
+    return int(row[0])
+
+class ListRow:
+    """
+    One row of a list page. Cell values, URLs and actions are built only when the template
+    reads them, so rows served from the fragment cache cost little more than their object.
+    """
+    __slots__ = ('rows', 'object', '_urls')
+
+    def __init__(self, rows, obj):
+        self.rows = rows
+        self.object = obj
+        self._urls = None
+
+    def __getitem__(self, key):
+        # Rows used to be dicts; keep item['urls'] style access working
+        if key not in ('object', 'fields', 'urls', 'edit_urls', 'actions', 'cache_key'):
+            raise KeyError(key)
+        return getattr(self, key)
+
+    @property
+    def fields(self):
+        return self.rows.view.get_row_fields(self.object)
+
+    @property
+    def urls(self):
+        if self._urls is None:
+            self._urls = self.rows.get_urls(self.object.pk)
+        return self._urls
+
+    @property
+    def edit_urls(self):
+        urls = self.urls
+        return {column: urls[f'edit:{column}'] for column in self.rows.view.inline_edit_fields}
+
+    @property
+    def actions(self):
+        urls = self.urls
+        return [{**action, 'url': urls[action['name']]} for action in self.rows.view.extra_actions]
+
+    @property
+    def cache_key(self):
+        return f'{self.rows.cache_prefix}:{self.object.pk}:{self.rows.row_versions.get(self.object.pk)}:{self.rows.columns}'
+
+
+class ListRows:
+    """Lazy sequence of ListRow over a page of objects; per-page work (URL templates, cache versions) is shared"""
+
+    def __init__(self, view, object_list):
+        self.view = view
+        self.object_list = list(object_list)
+        self.url_templates = view.get_row_url_templates()
+        self.row_versions = view.get_row_versions(self.object_list) if view.row_cache_timeout else {}
+        self.cache_prefix = view.model._meta.label_lower
+        self.columns = ','.join(view.fields)
+        if view.inline_edit_fields:
+            self.columns += ':' + ','.join(view.inline_edit_fields)
+
+    def get_urls(self, pk):
+        return {key: self.view._fill_row_url(url_template, pk) for key, url_template in self.url_templates.items()}
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __iter__(self):
+        for obj in self.object_list:
+            yield ListRow(self, obj)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [ListRow(self, obj) for obj in self.object_list[index]]
+        return ListRow(self, self.object_list[index])
+
+
 class _CRUDMixin:
     fields = None
     form_fields = None
@@ -44,6 +273,23 @@ class _CRUDMixin:
     url_namespace = None
     inline_formsets = []
     parent_view = None
+    row_cache_timeout = None
+    row_version_field = None
+    count_strategy = None
+    count_cache_timeout = 60
+    count_estimate_cap = 1000
+    list_mode = 'table'
+    scroll_chunk_size = 50
+    read_using = None
+    read_pin_seconds = 10
+    inline_edit_fields = []
+    background_delete = False
+    delete_batch_size = 500
+    cascade_preview_cap = 1000
+    aggregates = {}
+    aggregate_cache_timeout = None
+    validation_fail_fast = False
+    version_field = None
 
     def get_formsets(self):
         formsets = {}
@@ -68,6 +314,7 @@ class _CRUDMixin:
 
         return formsets
     
+    @timed('init_formsets')
     def init_formsets(self):
         self.formset_instances = {}
         self.all_formsets_by_prefix = {}
@@ -79,8 +326,7 @@ class _CRUDMixin:
                     instance=getattr(self, 'object', None),
                     prefix=name,
                 )
-                formset_instance.model_name = name
-                formset_instance.verbose_name = FormSetClass.model._meta.verbose_name_plural
+                self.prepare_formset(formset_instance, name, 0)
                 for form in formset_instance.forms:
                     form.children = []
                     self._apply_widget_styling_to_form(form)
@@ -98,14 +344,14 @@ class _CRUDMixin:
                         prefix=prefix,
                         parent_form=parent_form,
                     )
-                    child_formset.model_name = name
-                    child_formset.verbose_name = FormSetClass.model._meta.verbose_name_plural
+                    self.prepare_formset(child_formset, name, 1)
                     for form in child_formset.forms:
                         form.children = []
                         self._apply_widget_styling_to_form(form)
                     parent_form.children.append(child_formset)
                     self.all_formsets_by_prefix[prefix] = child_formset
 
+    @timed('bind_formsets')
     def bind_formsets(self, request):
         self.formset_instances = {}
         formsets = self.get_formsets()
@@ -118,7 +364,7 @@ class _CRUDMixin:
                     instance=getattr(self, 'object', None),
                     prefix=name,
                 )
-                formset_instance.verbose_name = FormSetClass.model._meta.verbose_name_plural
+                self.prepare_formset(formset_instance, name, 0)
                 for form in formset_instance.forms:
                     form.children = []
                     self._apply_widget_styling_to_form(form)
@@ -136,13 +382,35 @@ class _CRUDMixin:
                         prefix=f'{parent_name}-{i}-{name}',
                         parent_form=parent_form,
                     )
-                    child_formset.verbose_name = FormSetClass.model._meta.verbose_name_plural
+                    self.prepare_formset(child_formset, name, 1)
                     for form in child_formset.forms:
                         form.children = []
                         self._apply_widget_styling_to_form(form)
                     parent_form.children.append(child_formset)
 
-    def add_formset(self, formset_class_name, prefix, form_index):
+    def get_formset_form_url(self):
+        if not hasattr(self, '_formset_form_url'):
+            url_namespace = f'{self.url_namespace}:' if self.url_namespace else ''
+            try:
+                self._formset_form_url = reverse(f'{url_namespace}{self.model._meta.model_name}-formset-form')
+            except NoReverseMatch:
+                self._formset_form_url = None
+        return self._formset_form_url
+
+    def prepare_formset(self, formset, name, depth):
+        """
+        Attach what includes/formset.html renders: names, and the empty form as a <template>
+        whose index placeholder is specific to its nesting depth (__prefix0__, __prefix1__, ...),
+        so cloning a parent form leaves the placeholders of its nested templates intact.
+        """
+        formset.model_name = name
+        formset.verbose_name = formset.model._meta.verbose_name_plural
+        formset.add_url = self.get_formset_form_url()
+        formset.index_placeholder = f'__prefix{depth}__'
+        # Templates call this, so pages that are never rendered (valid POSTs) skip it
+        formset.empty_form_html = lambda: self.render_empty_form(name, formset.prefix, formset.index_placeholder, depth)
+
+    def add_formset(self, formset_class_name, prefix, form_index, depth=0):
         formsets = self.get_formsets()
         FormSetClass = formsets.get(formset_class_name)
 
@@ -161,22 +429,77 @@ class _CRUDMixin:
                     prefix=child_prefix,
                     queryset=ChildFormSetClass.model.objects.none(),
                 )
-                child_formset.model_name = name
+                self.prepare_formset(child_formset, name, depth + 1)
                 for form in child_formset.forms:
                     form.children = []
                 empty_form.children.append(child_formset)
         
         return empty_form
 
+    def get_formset_depth(self, formset_class_name):
+        """
+        How deeply formset_class_name nests in inline_formsets (0 for the top level), or None if
+        there is no such formset. Read from the config, not the prefix, which custom prefixes can
+        fill with dashes.
+        """
+        configs = {config.get('prefix', config['model']._meta.model_name): config for config in self.inline_formsets}
+        if formset_class_name not in configs:
+            return None
+        parents = {config['model']: config.get('nested_under') for config in self.inline_formsets}
+        depth = 0
+        parent = configs[formset_class_name].get('nested_under')
+        while parent in parents and depth < len(parents):
+            depth += 1
+            parent = parents[parent]
+        return depth
+
+    def render_formset_form(self, params):
+        """Response for "+ Add": the empty inline form params' formset_class, prefix and form_index ask for"""
+        formset_class = params.get('formset_class')
+        try:
+            form_index = int(params.get('form_index', 0))
+        except ValueError:
+            return HttpResponse('form_index must be an integer', status=400)
+        html = self.render_empty_form(formset_class, params.get('prefix'), form_index)
+        if html is None:
+            return HttpResponse(f"Formset class '{formset_class}' not found", status=400)
+        return HttpResponse(html)
+
+    def render_empty_form(self, formset_class_name, prefix, form_index, depth=None):
+        """
+        HTML for one new inline form, with its nested empty children, at prefix-form_index.
+
+        Forms whose markup is static (see is_static_form) are rendered once per (view, formset,
+        nesting depth) with placeholder prefix and index; later calls only substitute them.
+        Returns None for an unknown formset.
+        """
+        if depth is None:
+            depth = self.get_formset_depth(formset_class_name)
+        if depth is None or not prefix:
+            return None
+        # Depth is in the markup: nested <template>s use the __prefix{depth + 1}__ placeholder
+        key = (type(self.parent_view), formset_class_name, depth)
+        html = _empty_form_html.get(key)
+        if html is None:
+            form = self.add_formset(formset_class_name, EMPTY_FORM_PREFIX, EMPTY_FORM_INDEX, depth)
+            html = render_to_string('orange_sherbert/includes/form.html', {'form': form}, request=self.request)
+            # Re-render while developing so template edits show up
+            if not settings.DEBUG and is_static_form(form):
+                _empty_form_html[key] = html
+        # Index first: while nested templates are being cached, prefix itself holds the placeholders
+        return html.replace(EMPTY_FORM_INDEX, str(form_index)).replace(EMPTY_FORM_PREFIX, escape(prefix))
+
     def are_formsets_valid(self):
+        """Validate the formset tree a level at a time, batching each level's lookups and unique checks"""
         valid = True
-        stack = list(self.formset_instances.values())
-        while stack:
-            formset = stack.pop()
-            valid = formset.is_valid() and valid
-            for form in formset.forms:
-                if hasattr(form, 'children'):
-                    stack.extend(form.children)
+        level = list(self.formset_instances.values())
+        while level:
+            if self.validation_fail_fast and not valid:
+                for formset in level:
+                    skip_validation(formset)
+                break
+            valid = validate_formset_level(level, self.validation_fail_fast) and valid
+            level = [child for formset in level for form in formset.forms for child in getattr(form, 'children', [])]
         return valid
     
     def get_form_kwargs(self):
@@ -189,6 +512,7 @@ class _CRUDMixin:
             kwargs.update(parent_kwargs)
         return kwargs
     
+    @timed('widget_styling')
     def _apply_widget_styling_to_form(self, form):
         """Apply global and view-level widget styling to a form (including inline formset forms)"""
         from django import forms as django_forms
@@ -279,6 +603,8 @@ class _CRUDMixin:
                             field.widget.attrs['class'] = css_classes
     
     def get_form(self, form_class=None):
+        if self.view_type == 'update' and getattr(self, 'object', None) is not None:
+            self.saved_values = self.get_saved_values(self.object)
         form = super().get_form(form_class)
         
         # Apply widget styling to the main form
@@ -304,20 +630,60 @@ class _CRUDMixin:
                         child.instance = form.instance
                         stack.append(child)
     
+    def get_job_owner(self):
+        """enqueue_job() kwargs limiting a job to whoever starts it (anonymous users by session) and to this view"""
+        session = self.request.session
+        if not self.request.user.is_authenticated and session.session_key is None:
+            session.save()
+        return {'user': self.request.user, 'session_key': session.session_key, 'scope': self.get_job_scope()}
+
+    def get_job_scope(self):
+        """Name base of this view's URLs (url_prefix or model name); its jobs URL only serves jobs it started"""
+        return getattr(self.parent_view, 'url_prefix', None) or self.model._meta.model_name
+
+    def render_job(self, job_id):
+        """Respond to a request that started a background job with its polling progress fragment"""
+        url_namespace = f'{self.url_namespace}:' if self.url_namespace else ''
+        context = {
+            'job': get_job(job_id),
+            'job_url': reverse(f'{url_namespace}{self.get_job_scope()}-job', kwargs={'job_id': job_id}),
+        }
+        template_name = 'orange_sherbert/includes/job_status.html' if self.request.htmx else 'orange_sherbert/job.html'
+        return HttpResponse(render_to_string(template_name, context, request=self.request), status=202)
+
+    def get_read_using(self):
+        """Database alias for read-only queries, or None for the default routing"""
+        if self.request.COOKIES.get(PRIMARY_PIN_COOKIE):
+            return None
+        return self.read_using
+
+    def pin_reads_to_primary(self, response):
+        if self.read_using and self.read_pin_seconds:
+            response.set_cookie(PRIMARY_PIN_COOKIE, '1', max_age=self.read_pin_seconds, httponly=True, samesite='Lax')
+        return response
+
+    @timed('get_queryset')
     def get_queryset(self, **kwargs):
         queryset = super().get_queryset()
+
+        # List and detail pages only read; create/update/delete always fetch from the primary
+        if self.view_type in ('list', 'detail'):
+            read_using = self.get_read_using()
+            if read_using:
+                queryset = queryset.using(read_using)
         
         # Call parent_view's get_queryset if it exists
         if self.parent_view and hasattr(self.parent_view, 'get_queryset'):
             queryset = self.parent_view.get_queryset(queryset, self.request)
+
+        # Search/filter/sort params only shape the list; other pages just carry them (get_list_query)
+        if self.view_type != 'list':
+            return queryset
         
-        filter_fields = self.filter_fields
-        if filter_fields:
-            for field in filter_fields:
-                field_name = field if isinstance(filter_fields, list) else field
-                field_value = self.request.GET.get(field_name)
-                if field_value:
-                    queryset = queryset.filter(**{field_name: field_value})
+        for spec in self.get_filter_specs():
+            lookups = get_filter_lookups(spec, self.request.GET)
+            if lookups:
+                queryset = queryset.filter(**lookups)
         
         search_query = self.request.GET.get('search', '').strip()
         search_fields = self.search_fields
@@ -327,33 +693,287 @@ class _CRUDMixin:
                 q_objects |= Q(**{f'{field}__icontains': search_query})
             queryset = queryset.filter(q_objects)
         
-        sort_by = self.request.GET.get('sort_by')
-        sort_dir = self.request.GET.get('sort_dir', 'asc')
-        if sort_by:
-            property_field_map = getattr(self, 'property_field_map', {})
-            db_field = property_field_map.get(sort_by, sort_by)
-            order_field = f'-{db_field}' if sort_dir == 'desc' else db_field
-            queryset = queryset.order_by(order_field)
-        
-        return queryset
+        sort = self.get_sort()
+        if sort:
+            sort_fields = self.get_sort_fields()
+            ordering = [f'-{sort_fields[column]}' if descending else sort_fields[column] for column, descending in sort]
+        else:
+            query = queryset.query
+            ordering = list(query.order_by or (self.model._meta.ordering if query.default_ordering else ()))
+        # A trailing pk makes the order total, so rows sharing sort values never shuffle between pages
+        pk_names = ('pk', self.model._meta.pk.name)
+        if not any(isinstance(entry, str) and entry.lstrip('-') in pk_names for entry in ordering):
+            ordering.append('pk')
         
+        return queryset.order_by(*ordering)
+
+    def get_filter_specs(self):
+        return get_filter_specs(self.model, self.filter_fields)
+
+    def get_filter_widgets(self):
+        """Filter specs with their current values, in the shape list.html renders them"""
+        params = self.request.GET
+        widgets = []
+        for spec in self.get_filter_specs():
+            widget = {'name': spec.name, 'label': spec.label, 'type': spec.type}
+            if spec.type == 'range':
+                widget['input_type'] = get_input_type(spec.field)
+                widget['gte'] = params.get(f'{spec.name}__gte', '')
+                widget['lte'] = params.get(f'{spec.name}__lte', '')
+            elif spec.type == 'null':
+                widget['choices'] = NULL_CHOICES
+            elif spec.type == 'boolean':
+                widget['choices'] = BOOLEAN_CHOICES
+            widgets.append(widget)
+        return widgets
+
+    def get_sort_fields(self):
+        """Sortable columns, each mapped to the model field it orders by; unmapped properties can't sort"""
+        sort_fields = {}
+        for column in self.fields or ():
+            lookup = self.property_field_map.get(column, column)
+            field = resolve_field(self.model, lookup)
+            if field is not None and field.concrete and not field.many_to_many:
+                sort_fields[column] = lookup
+        return sort_fields
+
+    def get_sort(self):
+        """The requested ordering as [(column, descending)], from ?sort=author,-pub_date; unknown columns are dropped"""
+        sort = self.request.GET.get('sort')
+        if sort is None and self.request.GET.get('sort_by'):
+            # Single-column links from before multi-column sorting
+            sort = ('-' if self.request.GET.get('sort_dir') == 'desc' else '') + self.request.GET['sort_by']
+        sort_fields = self.get_sort_fields()
+        keys = []
+        for entry in (sort or '').split(','):
+            entry = entry.strip()
+            column = entry.lstrip('-')
+            if column in sort_fields and column not in dict(keys):
+                keys.append((column, entry.startswith('-')))
+        return keys[:MAX_SORT_KEYS]
+
+    def get_sort_headers(self):
+        """
+        Column headers for the list table. Clicking a header sorts by it first, keeping the
+        previous keys as tiebreakers; clicking the leading column again flips its direction.
+        """
+        sort = self.get_sort()
+        positions = {column: (index, descending) for index, (column, descending) in enumerate(sort, 1)}
+        sort_fields = self.get_sort_fields()
+        headers = []
+        for column, label in self.fields.items():
+            header = {'name': column, 'label': label, 'sort': None, 'direction': None, 'position': None}
+            if column in sort_fields:
+                if sort and sort[0][0] == column:
+                    keys = [(column, not sort[0][1]), *sort[1:]]
+                else:
+                    keys = [(column, False), *(key for key in sort if key[0] != column)]
+                header['sort'] = ','.join(('-' if descending else '') + name for name, descending in keys[:MAX_SORT_KEYS])
+                if column in positions:
+                    header['position'], descending = positions[column]
+                    header['direction'] = 'desc' if descending else 'asc'
+            headers.append(header)
+        return headers
+
+    def get_row_fields(self, obj):
+        # A generator, so each value is read only as the template renders its cell
+        for field_name, verbose_name in self.fields.items():
+            yield field_name, verbose_name, getattr(obj, field_name, '')
+
+    def get_row_url_templates(self):
+        """Reverse each per-row URL once with a placeholder pk instead of once per row"""
+        url_namespace = f'{self.url_namespace}:' if self.url_namespace else ''
+        model_name = self.model._meta.model_name
+        url_names = {view_type: (f'{url_namespace}{model_name}-{view_type}', {}) for view_type in ('detail', 'update', 'delete')}
+        for action in self.extra_actions:
+            url_names[action['name']] = (f"{url_namespace}{model_name}-{action['name']}", {})
+        for column in self.inline_edit_fields:
+            url_names[f'edit:{column}'] = (f'{url_namespace}{model_name}-edit-field', {'field': column})
+
+        url_templates = {}
+        for key, (url_name, url_kwargs) in url_names.items():
+            url_templates[key] = (url_name, None, url_kwargs)
+            for placeholder in PK_PLACEHOLDERS:
+                try:
+                    url_templates[key] = (reverse(url_name, kwargs={'pk': placeholder, **url_kwargs}), placeholder, url_kwargs)
+                    break
+                except NoReverseMatch:
+                    continue
+        return url_templates
+
+    def _fill_row_url(self, url_template, pk):
+        url, placeholder, url_kwargs = url_template
+        if placeholder is None:
+            # Path converter rejected every placeholder; reverse this row directly
+            return reverse(url, kwargs={'pk': pk, **url_kwargs})
+        return url.replace(placeholder, quote(str(pk), safe=RFC3986_SUBDELIMS + '/~:@'))
+
+    def get_row_versions(self, object_list):
+        """
+        Cache version of each row: its row_version_field value (or invalidate_row_cache() token)
+        plus the tokens of the rows its foreign key columns display, all from one get_many()
+        """
+        relations = get_row_cache_relations(self.model, self.fields)
+        track_row_cache(self.model, relations)
+        keys = []
+        for obj in object_list:
+            if not self.row_version_field:
+                keys.append(row_version_key(self.model, obj.pk))
+            for field in relations:
+                keys.append(row_version_key(field.related_model, getattr(obj, field.attname)))
+        tokens = cache.get_many(keys) if keys else {}
+
+        versions = {}
+        for obj in object_list:
+            if self.row_version_field:
+                version = [getattr(obj, self.row_version_field)]
+            else:
+                version = [tokens.get(row_version_key(self.model, obj.pk), 0)]
+            for field in relations:
+                version.append(tokens.get(row_version_key(field.related_model, getattr(obj, field.attname)), 0))
+            versions[obj.pk] = ':'.join(map(str, version))
+        return versions
+
+    def get_row_data(self, object_list):
+        return ListRows(self, object_list)
+
+    def get_cached_count(self, queryset):
+        label = self.model._meta.label_lower
+        generation = cache.get(COUNT_GENERATION_KEY.format(label=label), 0)
+        query = md5(f'{queryset.db}:{queryset.query}'.encode()).hexdigest()
+        key = COUNT_KEY.format(label=label, generation=generation, query=query)
+        count = cache.get(key)
+        if count is None:
+            count = queryset.count()
+            cache.set(key, count, self.count_cache_timeout)
+        return count
+
+    def get_total_count(self, queryset):
+        """Return (count, display) for the list total according to count_strategy"""
+        queryset = queryset.order_by()
+        if self.count_strategy == 'cached':
+            count = self.get_cached_count(queryset)
+            return count, str(count)
+
+        if self.count_strategy == 'estimated':
+            if not queryset.query.where:
+                # Unfiltered: trust the planner's estimate, else a cheap cached counter
+                estimate = estimate_table_rows(self.model, queryset.db)
+                if estimate is not None:
+                    return estimate, f'~{estimate}'
+                count = self.get_cached_count(queryset)
+                return count, str(count)
+            cap = self.count_estimate_cap
+            count = queryset[:cap + 1].count()
+            if count > cap:
+                return cap, f'{cap}+'
+            return count, str(count)
+
+        count = queryset.count()
+        return count, str(count)
+
+    @property
+    def caches_totals(self):
+        """Whether list totals (counts or footer aggregates) are cached and need expiring on writes"""
+        return self.count_strategy in ('cached', 'estimated') or bool(self.aggregate_cache_timeout)
+
+    def get_aggregate_expressions(self):
+        """
+        {alias: (column, label, expression)} for each declared aggregate on a visible column.
+        Entries are function names ('sum', 'avg', 'min', 'max', 'count') or (label, expression) pairs.
+        """
+        expressions = {}
+        for column, entries in self.aggregates.items():
+            # Restricted columns the user can't see have already been dropped from fields
+            if column not in self.fields:
+                continue
+            lookup = self.property_field_map.get(column, column)
+            for index, entry in enumerate(entries if isinstance(entries, list) else [entries]):
+                if isinstance(entry, str):
+                    expressions[f'{column}__{entry}'] = (column, entry.title(), AGGREGATE_FUNCTIONS[entry](lookup))
+                else:
+                    label, expression = entry
+                    expressions[f'{column}__{index}'] = (column, label, expression)
+        return expressions
+
+    def get_aggregates(self, queryset):
+        """Evaluate every aggregate over the whole filtered queryset in one query, cached if configured"""
+        expressions = self.get_aggregate_expressions()
+        if not expressions:
+            return {}
+        queryset = queryset.order_by()
+        key = None
+        if self.aggregate_cache_timeout:
+            # The compiled query is the normalised form of the filter/search params (sort doesn't matter here)
+            label = self.model._meta.label_lower
+            generation = cache.get(COUNT_GENERATION_KEY.format(label=label), 0)
+            # Which aggregates exist depends on the columns this user may see
+            aliases = ','.join(sorted(expressions))
+            query = md5(f'{queryset.db}:{queryset.query}:{aliases}'.encode()).hexdigest()
+            key = AGGREGATE_KEY.format(label=label, generation=generation, query=query)
+            values = cache.get(key)
+            if values is not None:
+                return values
+        with phase('aggregates'):
+            values = queryset.aggregate(**{alias: expression for alias, (_, _, expression) in expressions.items()})
+        if key:
+            cache.set(key, values, self.aggregate_cache_timeout)
+        return values
+
+    def get_aggregate_row(self, queryset):
+        """Footer cells in column order: a list of (label, value) per column"""
+        expressions = self.get_aggregate_expressions()
+        values = self.get_aggregates(queryset)
+        cells = {column: [] for column in self.fields}
+        for alias, (column, label, _) in expressions.items():
+            value = values.get(alias)
+            if isinstance(value, (Decimal, float)) and alias.endswith('__avg'):
+                value = round(value, 2)
+            cells[column].append((label, value))
+        return list(cells.values())
+
+    async def aget_total_count(self, queryset):
+        queryset = queryset.order_by()
+        if self.count_strategy == 'exact':
+            count = await queryset.acount()
+            return count, str(count)
+        if self.count_strategy == 'estimated' and queryset.query.where:
+            cap = self.count_estimate_cap
+            count = await queryset[:cap + 1].acount()
+            if count > cap:
+                return cap, f'{cap}+'
+            return count, str(count)
+        # Cached counters and backend estimates go through the sync cache and cursor APIs
+        return await sync_to_async(self.get_total_count)(queryset)
+
+    def get_list_rows(self, queryset):
+        """Return (rows, next_cursor) for the current list page"""
+        if self.list_mode == 'infinite':
+            return get_keyset_chunk(queryset, self.scroll_chunk_size, self.request.GET.get('cursor'))
+        return queryset, None
+
+    async def aget_list_rows(self, queryset):
+        if self.list_mode == 'infinite':
+            return await aget_keyset_chunk(queryset, self.scroll_chunk_size, self.request.GET.get('cursor'))
+        return [obj async for obj in queryset.aiterator()], None
+
+    @timed('context')
     def get_context_data(self, **kwargs):
+        # Async views fetch rows and totals up front and hand them in here
+        list_rows = kwargs.pop('list_rows', None)
+        total_count = kwargs.pop('total_count', None)
         context = super().get_context_data(**kwargs)
         meta = self.model._meta
         object_data = []
 
         if 'object_list' in context:
-            for obj in context['object_list']:
-                field_tuples = []
-                for field_name, verbose_name in self.fields.items():
-                    value = getattr(obj, field_name, '')
-                    field_tuples.append((field_name, verbose_name, value))
-                
-                object_data.append({
-                    'object': obj,
-                    'fields': field_tuples,
-                })
-        
+            object_list, next_cursor = list_rows or self.get_list_rows(context['object_list'])
+            if next_cursor:
+                next_query = self.request.GET.copy()
+                next_query['cursor'] = next_cursor
+                context['next_query'] = next_query.urlencode()
+            object_data = self.get_row_data(object_list)
+
         url_namespace = f'{self.url_namespace}:' if self.url_namespace else ''
         context.update({
             'model_name': meta.model_name,
@@ -366,7 +986,27 @@ class _CRUDMixin:
             'search_query': self.request.GET.get('search', ''),
             'extra_actions': self.extra_actions,
             'url_namespace': url_namespace,
+            'row_cache_timeout': self.row_cache_timeout,
+            'list_query': self.get_list_query(),
         })
+
+        if self.view_type == 'update' and self.version_field:
+            context['version_param'] = VERSION_PARAM
+            context['version_value'] = self.get_version_value()
+
+        if self.view_type == 'list':
+            sort = self.get_sort()
+            context['sort'] = ','.join(('-' if descending else '') + column for column, descending in sort)
+            context['sort_headers'] = self.get_sort_headers()
+            context['multi_sort'] = len(sort) > 1
+            context['filter_widgets'] = self.get_filter_widgets()
+
+        if self.view_type == 'list' and self.count_strategy and 'cursor' not in self.request.GET:
+            context['total_count'], context['total_count_display'] = total_count or self.get_total_count(context['object_list'])
+
+        # Infinite-scroll chunks only append rows; the footer came with the first page
+        if self.view_type == 'list' and self.aggregates and 'cursor' not in self.request.GET:
+            context['aggregate_row'] = self.get_aggregate_row(context['object_list'])
         
         if self.view_type == 'detail' and 'object' in context:
             obj = context['object']
@@ -375,6 +1015,7 @@ class _CRUDMixin:
                 value = getattr(obj, field_name, '')
                 detail_fields.append((field_name, verbose_name, value))
             context['detail_fields'] = detail_fields
+            context['edit_urls'] = self.get_row_data([obj])[0].edit_urls if self.inline_edit_fields else {}
             
             # Add related items from inline formsets for detail view
             if self.inline_formsets:
@@ -398,7 +1039,7 @@ class _CRUDMixin:
                             queryset_filter = config.get('queryset_filter', {})
                             if queryset_filter:
                                 filter_kwargs.update(queryset_filter)
-                            related_objs = model.objects.filter(**filter_kwargs)
+                            related_objs = model.objects.using(obj._state.db).filter(**filter_kwargs)
                             
                             # Get fields to display
                             display_fields = config.get('fields', '__all__')
@@ -437,13 +1078,20 @@ class _CRUDMixin:
         
         return context
     
+    def get_list_query(self):
+        """The list's search/filter/sort state, carried in links to detail and form pages and back"""
+        query = self.request.GET.copy()
+        for key in ('cursor', '_profile'):
+            query.pop(key, None)
+        return query.urlencode()
+
     def get_success_url(self):
         model_name = self.model._meta.model_name
         url_name = f'{self.url_namespace}:{model_name}-list' if self.url_namespace else f'{model_name}-list'
         base_url = reverse(url_name)
         
-        # Preserve query parameters from the session if they exist
-        query_params = self.request.session.get('list_query_params', '')
+        # Return to the list with the search/filter/sort state the form page was opened with
+        query_params = self.get_list_query()
         if query_params:
             return f'{base_url}?{query_params}'
         return base_url
@@ -454,13 +1102,6 @@ class _CRUDMixin:
         elif self.view_type == 'update':
             self.object = self.get_object()
         
-        # Store query parameters from referrer for create/update/delete views
-        if self.view_type in ('create', 'update', 'delete'):
-            referer = request.META.get('HTTP_REFERER', '')
-            if referer and '?' in referer:
-                query_string = referer.split('?', 1)[1]
-                request.session['list_query_params'] = query_string
-        
         if self.inline_formsets:
             self.init_formsets()
         return super().get(request, *args, **kwargs)
@@ -475,32 +1116,24 @@ class _CRUDMixin:
         if self.view_type == 'delete':
             return super().post(request, *args, **kwargs)
         
-        if self.inline_formsets:
-            self.init_formsets()
-        
         if request.htmx:
-            formset_class = request.POST.get('formset_class')
-            prefix = request.POST.get('prefix')
-            form_index = int(request.POST.get('form_index', 0))
-            form = self.add_formset(formset_class, prefix, form_index)
-            if form:
-                html = render_to_string(
-                    'orange_sherbert/includes/form.html',
-                    {'form': form},
-                    request=request,
-                )
-                html = html.replace('__prefix__', str(form_index))
-                return HttpResponse(html)
-            return HttpResponse(f"Formset class '{formset_class}' not found", status=400)
+            return self.render_formset_form(request.POST)
 
         form = self.get_form()
         if self.inline_formsets:
             self.bind_formsets(request)
-            if form.is_valid() and self.are_formsets_valid():
-                return self.form_valid(form)
+            with phase('validation'):
+                valid = form.is_valid()
+                if valid or not self.validation_fail_fast:
+                    valid = self.are_formsets_valid() and valid
+                else:
+                    for formset in self.formset_instances.values():
+                        skip_validation(formset)
         else:
-            if form.is_valid():
-                return self.form_valid(form)
+            with phase('validation'):
+                valid = form.is_valid()
+        if valid:
+            return self.form_valid(form)
         return self.form_invalid(form)
 
     def form_valid(self, form):
@@ -510,19 +1143,157 @@ class _CRUDMixin:
         
         # Only save form if it has a save method (delete forms don't)
         if hasattr(form, 'save'):
-            self.object = form.save()
-            if self.inline_formsets:
+            if not self.save_form(form):
+                return self.render_conflict(form)
+            # Already saved; ModelFormMixin.form_valid() would save the object a second time
+            return self.pin_reads_to_primary(HttpResponseRedirect(self.get_success_url()))
+        
+        return self.pin_reads_to_primary(super().form_valid(form))
+
+    def save_form(self, form):
+        """Save the form and its inline formsets; False if the version check found a newer save"""
+        with phase('save'):
+            if self.view_type == 'update':
+                if not self.save_changed_fields(form):
+                    return False
+            else:
+                self.object = form.save()
+            if self.inline_formsets and hasattr(self, 'formset_instances'):
                 self.save_formsets()
-            
-            # Call parent_view's post_save if it exists (for M2M relations, etc.)
-            if self.parent_view and hasattr(self.parent_view, 'post_save'):
-                self.parent_view.post_save(self.object, self.request)
+        if self.caches_totals:
+            invalidate_cached_counts(self.model)
         
-        return super().form_valid(form)
+        # Call parent_view's post_save if it exists (for M2M relations, etc.)
+        if self.parent_view and hasattr(self.parent_view, 'post_save'):
+            self.parent_view.post_save(self.object, self.request)
+        return True
+
+    def get_version_updates(self, now):
+        """
+        {attname: value} that marks a row as written for row_version_field and version_field:
+        now for timestamps, F() + 1 for counters. Every write path applies these, including
+        the ones that bypass save(), so a stale update form never overwrites them unnoticed.
+        """
+        updates = {}
+        for name in dict.fromkeys(filter(None, (self.row_version_field, self.version_field))):
+            field = self.model._meta.get_field(name)
+            updates[field.attname] = now if isinstance(field, DateTimeField) else F(field.attname) + 1
+        return updates
+
+    def get_submitted_version(self, form):
+        """The version_field value the edit form was rendered with, or None if there is nothing to check"""
+        if not self.version_field or form.data.get(VERSION_PARAM) in (None, ''):
+            return None
+        try:
+            return self.model._meta.get_field(self.version_field).to_python(form.data[VERSION_PARAM])
+        except ValidationError:
+            return None
+
+    def get_version_value(self):
+        """Serialised version_field value the update form carries back, so a later save can detect edits in between"""
+        if not self.version_field:
+            return None
+        if self.request.method == 'POST' and VERSION_PARAM in self.request.POST:
+            # Re-rendered after a validation error: keep checking against the version first shown
+            return self.request.POST[VERSION_PARAM]
+        return self.model._meta.get_field(self.version_field).value_to_string(self.object)
+
+    def get_saved_values(self, obj):
+        """Loaded column values of obj, so save_changed_fields() can tell which ones were changed before the save"""
+        return {
+            field.attname: obj.__dict__[field.attname]
+            for field in obj._meta.concrete_fields if field.attname in obj.__dict__
+        }
+
+    def save_changed_fields(self, form):
+        """
+        Write only the columns that differ from the row as loaded (plus auto_now and version columns)
+        instead of every column. That covers the form's fields and whatever clean(), save(commit=False)
+        or parent_view.form_valid() set on the instance. With version_field, the row is first claimed by
+        a conditional UPDATE of the version columns; if another save got there first nothing is written
+        and this returns False. The write itself goes through save(), so overrides and signals still run.
+        """
+        obj = form.save(commit=False)
+        opts = self.model._meta
+        saved = getattr(self, 'saved_values', None)
+        update_fields = []
+        for field in opts.concrete_fields:
+            if field.primary_key:
+                continue
+            # Files compare by name, so a re-upload under the same name only shows up in changed_data
+            if field.name in form.changed_data:
+                update_fields.append(field.attname)
+            elif saved is not None and field.attname in obj.__dict__:
+                if field.attname not in saved or obj.__dict__[field.attname] != saved[field.attname]:
+                    update_fields.append(field.attname)
+
+        # Inline-only edits still write the version columns, so they are checked and bumped too
+        if update_fields or self.formsets_have_changed():
+            update_fields += [
+                field.attname for field in opts.concrete_fields
+                if getattr(field, 'auto_now', False) and field.attname not in update_fields
+            ]
+            versions = self.get_version_updates(timezone.now())
+            counters = [attname for attname, value in versions.items() if hasattr(value, 'resolve_expression')]
+            version = self.get_submitted_version(form)
+            with transaction.atomic(using=obj._state.db):
+                claimed = []
+                if version is not None:
+                    queryset = self.model._base_manager.using(obj._state.db).filter(
+                        pk=obj.pk, **{opts.get_field(self.version_field).attname: version},
+                    )
+                    if not queryset.update(**versions):
+                        return False
+                    # The claim already incremented the counters; save() must not add one again
+                    claimed = counters
+                for attname, value in versions.items():
+                    setattr(obj, attname, value)
+                obj.save(update_fields=[*update_fields, *(attname for attname in versions if attname not in claimed)])
+            # Counters were incremented in the database; read back the values the next form carries
+            if counters:
+                obj.refresh_from_db(fields=counters)
+
+        form.save_m2m()
+        self.object = obj
+        return True
+
+    def formsets_have_changed(self):
+        """Whether any inline form, at any depth, was added, edited or marked for deletion"""
+        level = list(getattr(self, 'formset_instances', {}).values())
+        while level:
+            if any(formset.has_changed() for formset in level):
+                return True
+            level = [child for formset in level for form in formset.forms for child in getattr(form, 'children', [])]
+        return False
+
+    def render_conflict(self, form):
+        """409 page for an update that lost the version check; nothing was saved"""
+        current = self.get_queryset().filter(pk=self.object.pk).first()
+        changes = [(form.fields[name].label or name, form.data.get(form.add_prefix(name), '')) for name in form.changed_data]
+        url_namespace = f'{self.url_namespace}:' if self.url_namespace else ''
+        context = {
+            'object': current,
+            'verbose_name': self.model._meta.verbose_name,
+            'changes': changes,
+            'update_url': self.request.get_full_path(),
+            'model_name': self.model._meta.model_name,
+            'url_namespace': url_namespace,
+            'list_query': self.get_list_query(),
+        }
+        return HttpResponse(
+            render_to_string('orange_sherbert/conflict.html', context, request=self.request),
+            status=409,
+        )
 
 class _CRUDListView(_CRUDMixin, ListView):
     template_name = 'orange_sherbert/list.html'
 
+    def get_template_names(self):
+        # Scroll requests only need the next chunk of rows, not the whole page
+        if self.list_mode == 'infinite' and 'cursor' in self.request.GET:
+            return ['orange_sherbert/includes/list_rows.html']
+        return super().get_template_names()
+
 class _CRUDDetailView(_CRUDMixin, DetailView):
     template_name = 'orange_sherbert/detail.html'
 
@@ -532,6 +1303,149 @@ class _CRUDCreateView(_CRUDMixin, CreateView):
 class _CRUDUpdateView(_CRUDMixin, UpdateView):
     template_name = 'orange_sherbert/update.html'
 
+class _CRUDFieldEditView(_CRUDMixin, UpdateView):
+    """Edit one column of one row in place: a single-field form, one narrow SELECT and one UPDATE"""
+    template_name = 'orange_sherbert/includes/field_edit.html'
+
+    def setup(self, request, *args, **kwargs):
+        super().setup(request, *args, **kwargs)
+        self.column = kwargs['field']
+        if self.column not in self.inline_edit_fields:
+            raise Http404(f"'{self.column}' is not editable inline")
+        # Columns showing a property (e.g. formatted_price) edit the field behind it
+        self.edit_field = self.property_field_map.get(self.column, self.column)
+        model_field = self.model._meta.get_field(self.edit_field)
+        if not model_field.concrete or model_field.many_to_many:
+            raise ImproperlyConfigured(f"inline_edit_fields entry '{self.column}' must be a concrete, non-M2M field")
+        self.fields = [self.edit_field]
+
+    def get_object(self, queryset=None):
+        return super().get_object(self.get_queryset().only(self.edit_field))
+
+    def get_context_data(self, **kwargs):
+        return {
+            'object': self.object,
+            'form': kwargs.get('form') or self.get_form(),
+            'column': self.column,
+            'edit_field': self.edit_field,
+            'edit_url': self.request.path,
+        }
+
+    def render_cell(self):
+        html = render_to_string(
+            'orange_sherbert/includes/field_cell.html',
+            {'value': getattr(self.object, self.column, ''), 'edit_url': self.request.path},
+            request=self.request,
+        )
+        return HttpResponse(html)
+
+    def get(self, request, *args, **kwargs):
+        self.object = self.get_object()
+        if 'cancel' in request.GET:
+            return self.render_cell()
+        return self.render_to_response(self.get_context_data())
+
+    def post(self, request, *args, **kwargs):
+        self.object = self.get_object()
+        form = self.get_form()
+        with phase('validation'):
+            valid = form.is_valid()
+        if valid:
+            return self.form_valid(form)
+        return self.form_invalid(form)
+
+    def form_valid(self, form):
+        if self.parent_view and hasattr(self.parent_view, 'form_valid'):
+            self.parent_view.form_valid(form)
+
+        with phase('save'):
+            self.object = form.save(commit=False)
+            versions = self.get_version_updates(timezone.now())
+            for attname, value in versions.items():
+                setattr(self.object, attname, value)
+            auto_now = [
+                field.attname for field in self.model._meta.concrete_fields if getattr(field, 'auto_now', False)
+            ]
+            self.object.save(update_fields=[self.edit_field, *auto_now, *versions])
+            counters = [attname for attname, value in versions.items() if hasattr(value, 'resolve_expression')]
+            if counters:
+                self.object.refresh_from_db(fields=counters)
+        if self.caches_totals:
+            invalidate_cached_counts(self.model)
+
+        if self.parent_view and hasattr(self.parent_view, 'post_save'):
+            self.parent_view.post_save(self.object, self.request)
+        return self.pin_reads_to_primary(self.render_cell())
+
+class _CRUDActionView(_CRUDMixin, DetailView):
+    """
+    Run a declarative extra action: {'update': {...}, 'condition': {...}} as one conditional
+    UPDATE, or {'task': func} as a background job calling func(job, obj)
+    """
+    http_method_names = ['post']
+
+    def get_action(self):
+        name = self.kwargs['action']
+        for action in self.extra_actions:
+            if action['name'] == name:
+                return action
+        # extra_actions only holds the actions this user may run; tell "forbidden" from "unknown"
+        if self.parent_view and any(action['name'] == name for action in self.parent_view.extra_actions):
+            raise PermissionDenied(f"You do not have permission to run '{name}'.")
+        raise Http404(f"Unknown action '{name}'")
+
+    def get_update_values(self, action):
+        values = {field: value() if callable(value) else value for field, value in action['update'].items()}
+        # update() skips save(), so bump the version columns the way a save would
+        for attname, value in self.get_version_updates(Now()).items():
+            values.setdefault(attname, value)
+        return values
+
+    def post(self, request, *args, **kwargs):
+        action = self.get_action()
+        if 'task' in action:
+            self.object = self.get_object()
+            job_id = enqueue_job(
+                action_task, self.model._meta.label, self.object.pk, get_task_path(action['task']), self.object._state.db,
+                label=f"{action.get('label', action['name'])}: {self.object}",
+                redirect=self.get_success_url(),
+                commit_using=self.object._state.db,
+                **self.get_job_owner(),
+            )
+            return self.render_job(job_id)
+
+        queryset = self.get_queryset().filter(pk=kwargs['pk'])
+        condition = action.get('condition')
+        if isinstance(condition, Q):
+            queryset = queryset.filter(condition)
+        elif condition:
+            queryset = queryset.filter(**condition)
+
+        with phase('save'):
+            updated = queryset.update(**self.get_update_values(action))
+
+        if not updated and not self.get_queryset().filter(pk=kwargs['pk']).exists():
+            raise Http404(f'No {self.model._meta.verbose_name} found matching the query')
+        # update() sends no post_save; expire the row for every cached list that shows it
+        if updated and is_row_cached(self.model):
+            invalidate_row_cache(self.model(pk=kwargs['pk']))
+        if updated and self.caches_totals:
+            invalidate_cached_counts(self.model)
+
+        if request.htmx:
+            # Re-render the row so the table shows the current state, applied or not
+            self.object = self.get_object()
+            html = render_to_string('orange_sherbert/includes/list_rows.html', {
+                'object_data': self.get_row_data([self.object]),
+                'row_cache_timeout': self.row_cache_timeout,
+                'list_query': self.get_list_query(),
+            }, request=request)
+            return self.pin_reads_to_primary(HttpResponse(html))
+        if not updated:
+            label = action.get('label', action['name'])
+            return HttpResponse(f"'{label}' does not apply to this {self.model._meta.verbose_name}.", status=409)
+        return self.pin_reads_to_primary(HttpResponseRedirect(self.get_success_url()))
+
 class _CRUDDeleteView(_CRUDMixin, DeleteView):
     template_name = 'orange_sherbert/delete.html'
     
@@ -539,15 +1453,210 @@ class _CRUDDeleteView(_CRUDMixin, DeleteView):
         # Ensure self.object is set before calling parent's get_context_data
         if not hasattr(self, 'object') or not self.object:
             self.object = self.get_object()
-        return super().get_context_data(**kwargs)
+        context = super().get_context_data(**kwargs)
+        if self.cascade_preview_cap:
+            queryset = self.model._base_manager.using(self.object._state.db).filter(pk=self.object.pk)
+            context['cascade_summary'] = get_cascade_summary(queryset, self.cascade_preview_cap)
+        return context
     
     def form_valid(self, form):
         # Set self.object before calling parent's form_valid
         # DeleteView needs this to delete the object
         if not hasattr(self, 'object') or not self.object:
             self.object = self.get_object()
+        if self.background_delete:
+            return self.start_background_delete()
         # Call the actual delete logic from DeleteView
-        return DeleteView.form_valid(self, form)
+        response = DeleteView.form_valid(self, form)
+        if self.caches_totals:
+            invalidate_cached_counts(self.model)
+        return self.pin_reads_to_primary(response)
+
+    def start_background_delete(self):
+        job_id = enqueue_job(
+            delete_task, self.model._meta.label, self.object.pk, self.delete_batch_size, self.object._state.db,
+            label=f'Delete {self.object}',
+            redirect=self.get_success_url(),
+            commit_using=self.object._state.db,
+            **self.get_job_owner(),
+        )
+        return self.pin_reads_to_primary(self.render_job(job_id))
+
+
+class _CRUDAPIView(_CRUDMixin, UpdateView):
+    """
+    JSON endpoints over the same queryset, permission and restricted-field rules as the HTML views.
+    Rows are serialised from values() projections; full lists stream, ?limit= pages use keyset cursors.
+    Create and update take JSON or form-encoded bodies and validate through the view's ModelForm.
+    A streamed list runs its query while the response is sent, after dispatch() returns, so query
+    diagnostics and phase timings don't cover it; ?limit= pages are fetched up front and are.
+    """
+    http_method_names = ['get', 'head', 'post', 'put', 'patch', 'delete']
+    api_max_limit = 1000
+    async_stream = False
+
+    def get_api_fields(self):
+        """Field lookups serialised for each object: pk plus the view's concrete columns"""
+        columns = self.fields or getattr(getattr(self.form_class, '_meta', None), 'fields', None) or []
+        names = ['pk']
+        for column in columns:
+            name = self.property_field_map.get(column, column)
+            field = resolve_field(self.model, name)
+            if field is not None and field.concrete and not field.many_to_many and name not in names:
+                names.append(name)
+        return names
+
+    def error(self, message, status):
+        return JsonResponse({'error': message}, status=status)
+
+    def get(self, request, *args, **kwargs):
+        if self.view_type == 'list':
+            return self.api_list()
+        try:
+            row = self.get_queryset().values(*self.get_api_fields()).get(pk=kwargs['pk'])
+        except self.model.DoesNotExist:
+            return self.error('Not found', 404)
+        return JsonResponse(row, encoder=DjangoJSONEncoder)
+
+    def api_list(self):
+        api_fields = self.get_api_fields()
+        queryset = self.get_queryset()
+        limit = self.request.GET.get('limit')
+
+        if limit is None:
+            values = queryset.values(*api_fields)
+            # Under ASGI a sync iterator would be read into memory before the first byte is sent
+            rows = values.aiterator(chunk_size=API_CHUNK_SIZE) if self.async_stream else values.iterator(chunk_size=API_CHUNK_SIZE)
+            next_url = None
+        else:
+            try:
+                limit = min(max(int(limit), 1), self.api_max_limit)
+            except ValueError:
+                return self.error('limit must be an integer', 400)
+            # Rows carry their ordering keys so the cursor can be encoded from them
+            keys = [name for name, _, _ in get_keyset_keys(queryset)]
+            rows, next_cursor = get_keyset_chunk(
+                queryset.values(*api_fields, *keys), limit, self.request.GET.get('cursor'),
+            )
+            rows = [{name: row[name] for name in api_fields} for row in rows]
+            next_url = None
+            if next_cursor:
+                next_query = self.request.GET.copy()
+                next_query['cursor'] = next_cursor
+                next_url = f'{self.request.path}?{next_query.urlencode()}'
+
+        encoder = DjangoJSONEncoder()
+        head, tail = '{"results": [', f'], "next": {encoder.encode(next_url)}}}'
+
+        def stream():
+            yield head
+            for index, row in enumerate(rows):
+                yield (',' if index else '') + encoder.encode(row)
+            yield tail
+
+        async def astream():
+            yield head
+            if isinstance(rows, list):
+                for index, row in enumerate(rows):
+                    yield (',' if index else '') + encoder.encode(row)
+            else:
+                index = 0
+                async for row in rows:
+                    yield (',' if index else '') + encoder.encode(row)
+                    index += 1
+            yield tail
+
+        return StreamingHttpResponse(astream() if self.async_stream else stream(), content_type='application/json')
+
+    def get_form_kwargs(self):
+        kwargs = super().get_form_kwargs()
+        if self.request.method in ('PUT', 'PATCH') or self.request.content_type == 'application/json':
+            kwargs['data'] = self.api_data
+            kwargs['files'] = None
+        if self.request.method == 'PATCH':
+            # Fields missing from a PATCH keep their current values
+            current = model_to_dict(self.object, fields=list(self.get_form_class().base_fields))
+            current = {
+                name: [getattr(item, 'pk', item) for item in value] if isinstance(value, list) else value
+                for name, value in current.items()
+            }
+            data = kwargs['data']
+            if isinstance(data, QueryDict):
+                # copy()/setlist() keep every value of multi-value (M2M) fields; dict() keeps only the last
+                data = data.copy()
+                for name, value in current.items():
+                    if name not in data:
+                        data.setlist(name, value if isinstance(value, list) else [value])
+                kwargs['data'] = data
+            else:
+                kwargs['data'] = {**current, **data}
+        return kwargs
+
+    def save(self, status):
+        if self.request.content_type == 'application/json':
+            try:
+                self.api_data = json.loads(self.request.body or b'{}')
+            except ValueError:
+                return self.error('Invalid JSON body', 400)
+        elif self.request.method in ('PUT', 'PATCH'):
+            self.api_data = QueryDict(self.request.body)
+        else:
+            self.api_data = self.request.POST
+
+        form = self.get_form()
+        with phase('validation'):
+            valid = form.is_valid()
+        if not valid:
+            return JsonResponse({'errors': form.errors.get_json_data()}, status=400)
+
+        if self.parent_view and hasattr(self.parent_view, 'form_valid'):
+            self.parent_view.form_valid(form)
+        if not self.save_form(form):
+            return self.error(f'This {self.model._meta.verbose_name} was changed after {VERSION_PARAM} was read; nothing was saved', 409)
+        row = self.model._default_manager.filter(pk=self.object.pk).values(*self.get_api_fields()).get()
+        return self.pin_reads_to_primary(JsonResponse(row, encoder=DjangoJSONEncoder, status=status))
+
+    def post(self, request, *args, **kwargs):
+        if self.view_type == 'create':
+            self.object = None
+            return self.save(201)
+        return self.put(request, *args, **kwargs)
+
+    def put(self, request, *args, **kwargs):
+        self.object = self.get_object()
+        return self.save(200)
+
+    patch = put
+
+    def delete(self, request, *args, **kwargs):
+        self.object = self.get_object()
+        with phase('save'):
+            self.object.delete()
+        if self.caches_totals:
+            invalidate_cached_counts(self.model)
+        return self.pin_reads_to_primary(HttpResponse(status=204))
+
+class _CRUDJobView(_CRUDMixin, DetailView):
+    """Progress of a background job started by one of this view's deletes or actions; polled over htmx"""
+    template_name = 'orange_sherbert/job.html'
+
+    def get(self, request, *args, **kwargs):
+        job = get_job(kwargs['job_id'])
+        # Jobs are only visible to whoever started them, at the jobs URL of the view that started them
+        if job is None or not is_job_owner(job, request) or job.get('scope') not in (None, self.get_job_scope()):
+            raise Http404('Unknown job')
+        if request.htmx:
+            self.template_name = 'orange_sherbert/includes/job_status.html'
+        return self.render_to_response({'job': job, 'job_url': request.path})
+
+
+class _CRUDFormsetFormView(_CRUDMixin, DetailView):
+    """
+    One empty inline form for "+ Add" when the page's <template> can't be cloned. Unlike the
+    form views it fetches no object and builds no formsets, so no querysets are evaluated.
+    """
+    def get(self, request, *args, **kwargs):
+        return self.render_formset_form(request.GET)
 
 
 class CRUDView(View):
@@ -555,13 +1664,35 @@ class CRUDView(View):
     enforce_model_permissions = False
     fields = []
     form_fields = []
-    extra_actions = []
+    extra_actions = []  # Row actions: custom views, declarative updates or tasks (see README)
     restricted_fields = []
     filter_fields = {}
     search_fields = []
     property_field_map = {}
     inline_formsets = []
     field_widgets = {}  # View-level widget configuration: {'field_name': ('WidgetClass', 'css classes', {attrs})}
+    row_cache_timeout = None  # Seconds to cache rendered list cells per row
+    row_version_field = None  # Column that changes on every write, e.g. 'updated_at'
+    count_strategy = None  # List total: None, 'exact', 'cached' or 'estimated'
+    count_cache_timeout = 60  # Seconds to keep cached totals
+    count_estimate_cap = 1000  # 'estimated' counts up to this many, then shows 'N+'
+    list_mode = 'table'  # 'table' or 'infinite' (keyset-paginated scrolling)
+    scroll_chunk_size = 50  # Rows per chunk in 'infinite' mode
+    read_using = None  # Database alias (e.g. a replica) for reads
+    read_pin_seconds = 10  # Read from the primary this long after a write
+    instrument = None  # Server-Timing per request; None follows the setting
+    query_budget = None  # Max queries per request: an int or {'list': 5, ...}
+    allow_profiling = True  # Allow ?_profile=1 via CRUDProfilingMiddleware
+    inline_edit_fields = []  # Columns editable in place, e.g. ['location']
+    background_delete = False  # Delete in batches on the task backend
+    delete_batch_size = 500  # Rows per batch for background deletes
+    cascade_preview_cap = 1000  # Cascade counts on the delete page; None hides them
+    aggregates = {}  # List footer totals, e.g. {'price': ['sum', 'avg']}
+    aggregate_cache_timeout = None  # Seconds to cache footer totals
+    validation_fail_fast = False  # Stop validating inline formsets at the first invalid one
+    version_field = None  # Optimistic concurrency column, e.g. 'updated_at'
+    api = False  # Also register JSON endpoints under <prefix>/api/
+    api_max_limit = 1000  # Largest ?limit= page for API lists
     view_type = None
     url_namespace = None
     url_prefix = None  # Custom URL prefix to override model name (e.g., 'admin-user' instead of 'user')
@@ -572,30 +1703,36 @@ class CRUDView(View):
     update_template_name = 'orange_sherbert/update.html'
     delete_template_name = 'orange_sherbert/delete.html'
     
-    def dispatch(self, request, *args, **kwargs):
-        view_type = getattr(self, 'view_type', 'list')
-        
+    view_classes = {
+        'list': _CRUDListView,
+        'detail': _CRUDDetailView,
+        'create': _CRUDCreateView,
+        'update': _CRUDUpdateView,
+        'delete': _CRUDDeleteView,
+        'edit_field': _CRUDFieldEditView,
+        'action': _CRUDActionView,
+        'job': _CRUDJobView,
+        'formset_form': _CRUDFormsetFormView,
+    }
+
+    def get_permission(self, view_type):
         permission_map = {
             'list': 'view',
             'detail': 'view',
             'create': 'add',
             'update': 'change',
             'delete': 'delete',
+            'edit_field': 'change',
+            'action': 'change',
+            'job': 'view',
+            'formset_form': 'view',  # A blank form shows no data; saving it still needs add/change
         }
-        view_classes = {
-            'list': _CRUDListView,
-            'detail': _CRUDDetailView,
-            'create': _CRUDCreateView,
-            'update': _CRUDUpdateView,
-            'delete': _CRUDDeleteView,
-        }
-        view_class = view_classes[view_type]
-
         action = permission_map.get(view_type, 'view')
         app_label = self.model._meta.app_label
         model_name = self.model._meta.model_name
-        permission = f'{app_label}.{action}_{model_name}'
-        
+        return f'{app_label}.{action}_{model_name}'
+
+    def get_view_kwargs(self, view_type, has_perm):
         # Create instance-level copies of fields to avoid mutating class-level attributes
         if self.fields == '__all__':
             instance_fields = {f.name: f.verbose_name for f in self.model._meta.fields if not f.primary_key}
@@ -607,14 +1744,20 @@ class CRUDView(View):
         # Filter out restricted fields based on user permissions
         if self.restricted_fields:
             for field, required_permission in self.restricted_fields.items():
-                if field in instance_fields and not request.user.has_perm(required_permission):
+                if field in instance_fields and not has_perm(required_permission):
                     del instance_fields[field]
-                if instance_form_fields and field in instance_form_fields and not request.user.has_perm(required_permission):
+                if instance_form_fields and field in instance_form_fields and not has_perm(required_permission):
                     del instance_form_fields[field]
- 
-        if self.enforce_model_permissions and not request.user.has_perm(permission):
-            return HttpResponseForbidden("You do not have permission to perform this action.")
         
+        # Columns are only editable in place for users who could change the object and see the column
+        restricted_fields = dict(self.restricted_fields)
+        inline_edit_fields = [
+            field for field in self.inline_edit_fields
+            if field not in restricted_fields or has_perm(restricted_fields[field])
+        ]
+        if inline_edit_fields and self.enforce_model_permissions and not has_perm(self.get_permission('edit_field')):
+            inline_edit_fields = []
+
         # For create/update views, replace properties with their underlying model fields
         form_fields = instance_form_fields if instance_form_fields else instance_fields
         if view_type in ('create', 'update') and self.property_field_map:
@@ -630,17 +1773,40 @@ class CRUDView(View):
         # Check if custom form_class is defined
         has_custom_form = hasattr(self, 'form_class') and self.form_class is not None
         
+        # Hide actions the user lacks the 'permission' for
+        extra_actions = [
+            action for action in self.extra_actions
+            if not action.get('permission') or has_perm(action['permission'])
+        ]
+
         view_kwargs = {
             'model': self.model,
             'filter_fields': self.filter_fields,
             'search_fields': self.search_fields,
-            'extra_actions': self.extra_actions,
+            'extra_actions': extra_actions,
             'property_field_map': self.property_field_map,
             'view_type': view_type,
             'form_fields': instance_form_fields,
             'url_namespace': self.url_namespace,
             'inline_formsets': self.inline_formsets,
             'parent_view': self,
+            'row_cache_timeout': self.row_cache_timeout,
+            'row_version_field': self.row_version_field,
+            'count_strategy': self.count_strategy,
+            'count_cache_timeout': self.count_cache_timeout,
+            'count_estimate_cap': self.count_estimate_cap,
+            'list_mode': self.list_mode,
+            'scroll_chunk_size': self.scroll_chunk_size,
+            'read_using': self.read_using,
+            'read_pin_seconds': self.read_pin_seconds,
+            'inline_edit_fields': inline_edit_fields,
+            'background_delete': self.background_delete,
+            'delete_batch_size': self.delete_batch_size,
+            'cascade_preview_cap': self.cascade_preview_cap,
+            'aggregates': self.aggregates,
+            'aggregate_cache_timeout': self.aggregate_cache_timeout,
+            'validation_fail_fast': self.validation_fail_fast,
+            'version_field': self.version_field,
         }
         
         # Only pass fields if no custom form_class (Django doesn't allow both)
@@ -660,9 +1826,90 @@ class CRUDView(View):
             view_kwargs['template_name'] = self.update_template_name
         elif view_type == 'delete':
             view_kwargs['template_name'] = self.delete_template_name
+
+        return view_kwargs
+
+    def is_instrumented(self):
+        if self.instrument is not None:
+            return self.instrument
+        return getattr(settings, 'ORANGE_SHERBERT_INSTRUMENTATION', False)
+
+    def dispatch(self, request, *args, **kwargs):
+        diagnostics = getattr(settings, 'ORANGE_SHERBERT_QUERY_DIAGNOSTICS', False)
+        instrumented = self.is_instrumented()
+        if not diagnostics and not instrumented:
+            return self.dispatch_crud_view(request, *args, **kwargs)
+
+        with ExitStack() as stack:
+            capture = stack.enter_context(QueryCapture()) if diagnostics else None
+            timer = stack.enter_context(PhaseTimer()) if instrumented else None
+            response = self.dispatch_crud_view(request, *args, **kwargs)
+            # Render inside the capture so queries issued from templates are counted too
+            if hasattr(response, 'render'):
+                with phase('render'):
+                    response.render()
+        if timer:
+            self.report_timings(timer, request, response)
+        if capture:
+            self.report_queries(capture.report, response)
+        return response
+
+    def dispatch_crud_view(self, request, *args, **kwargs):
+        view_type = getattr(self, 'view_type', 'list')
+        if view_type in ('api_list', 'api_detail'):
+            return self.dispatch_api(request, view_type, *args, **kwargs)
+        view_kwargs = self.get_view_kwargs(view_type, request.user.has_perm)
+
+        if self.enforce_model_permissions and not request.user.has_perm(self.get_permission(view_type)):
+            return HttpResponseForbidden("You do not have permission to perform this action.")
         
-        view = view_class.as_view(**view_kwargs)
+        view = self.view_classes[view_type].as_view(**view_kwargs)
+        return view(request, *args, **kwargs)
+
+    def dispatch_api(self, request, api_view_type, *args, **kwargs):
+        # Each endpoint/method pair behaves (and is authorised) like the matching HTML view
+        method = 'GET' if request.method == 'HEAD' else request.method
+        view_type = API_VIEW_TYPES.get((api_view_type, method))
+        if view_type is None:
+            allowed = [m for (api_type, m) in API_VIEW_TYPES if api_type == api_view_type]
+            return HttpResponseNotAllowed(allowed)
+
+        if self.enforce_model_permissions and not request.user.has_perm(self.get_permission(view_type)):
+            return JsonResponse({'error': 'You do not have permission to perform this action.'}, status=403)
+
+        view_kwargs = self.get_view_kwargs(view_type, request.user.has_perm)
+        view_kwargs.pop('template_name', None)
+        view_kwargs['api_max_limit'] = self.api_max_limit
+        view_kwargs['async_stream'] = isinstance(self, AsyncCRUDView)
+        view = _CRUDAPIView.as_view(**view_kwargs)
         return view(request, *args, **kwargs)
+
+    def report_timings(self, timer, request, response):
+        response['Server-Timing'] = timer.server_timing()
+        crud_request_timed.send(
+            sender=self.__class__,
+            request=request,
+            view_type=getattr(self, 'view_type', 'list'),
+            timings=timer.summary(),
+        )
+
+    def report_queries(self, report, response):
+        view_type = getattr(self, 'view_type', 'list')
+        label = f'{self.__class__.__name__} {view_type}'
+        response.crud_query_report = report
+        for group in report.repeated():
+            sources = ', '.join(group.sources)
+            diagnostics_logger.warning('%s repeated a query %d times (triggered by %s): %s', label, group.count, sources, group.sql)
+        # Live requests only log an overrun; orange_sherbert.testing turns it into a failure
+        budget = self.get_query_budget(view_type)
+        if budget is not None and report.count > budget:
+            diagnostics_logger.error('%s ran %d queries, budget is %d\n%s', label, report.count, budget, report.format())
+
+    @classmethod
+    def get_query_budget(cls, view_type):
+        if isinstance(cls.query_budget, dict):
+            return cls.query_budget.get(view_type)
+        return cls.query_budget
     
     @classmethod
     def get_model_name(cls):
@@ -680,22 +1927,145 @@ class CRUDView(View):
         name_base = cls.url_prefix if cls.url_prefix else model_name
 
         pk_type = cls.path_converter
+        # A misspelt filter fails here, at startup, rather than as a 500 on the list page
+        check_filter_fields(cls.model, cls.filter_fields)
+        if cls.row_cache_timeout:
+            # Before any request, so writes in this process expire rows cached by others
+            track_row_cache(cls.model, get_row_cache_relations(cls.model, cls.fields))
         
         urls = [
             path(f'{url_base}/', cls.as_view(view_type='list'), name=f'{name_base}-list'),
             path(f'{url_base}/create/', cls.as_view(view_type='create'), name=f'{name_base}-create'),
+        ]
+
+        # Before the <pk> routes, which a slug or str path_converter would also match
+        if cls.inline_formsets:
+            urls.append(path(f'{url_base}/formset-form/', cls.as_view(view_type='formset_form'), name=f'{name_base}-formset-form'))
+        if cls.api:
+            urls += [
+                path(f'{url_base}/api/', cls.as_view(view_type='api_list'), name=f'{name_base}-api-list'),
+                path(f'{url_base}/api/<{pk_type}:pk>/', cls.as_view(view_type='api_detail'), name=f'{name_base}-api-detail'),
+            ]
+
+        urls += [
             path(f'{url_base}/<{pk_type}:pk>/', cls.as_view(view_type='detail'), name=f'{name_base}-detail'),
             path(f'{url_base}/<{pk_type}:pk>/update/', cls.as_view(view_type='update'), name=f'{name_base}-update'),
             path(f'{url_base}/<{pk_type}:pk>/delete/', cls.as_view(view_type='delete'), name=f'{name_base}-delete'),
         ]
+
+        if cls.background_delete or any('task' in action for action in cls.extra_actions):
+            urls.append(path(f'{url_base}/jobs/<str:job_id>/', cls.as_view(view_type='job'), name=f'{name_base}-job'))
+
+        if cls.inline_edit_fields:
+            urls.append(path(
+                f'{url_base}/<{pk_type}:pk>/edit-field/<str:field>/',
+                cls.as_view(view_type='edit_field'),
+                name=f'{name_base}-edit-field',
+            ))
         
         if cls.extra_actions:
             for action in cls.extra_actions:
                 action_name = action['name']
-                view_class = action['view']
-                
                 url_name = f"{name_base}-{action_name}"
                 url_path = f'{url_base}/<{pk_type}:pk>/{action_name}/'
-                urls.append(path(url_path, view_class.as_view(), name=url_name))
+
+                # Declarative and task actions run in this view; others bring their own view
+                if 'update' in action or 'task' in action:
+                    view = cls.as_view(view_type='action')
+                    urls.append(path(url_path, view, {'action': action_name}, name=url_name))
+                else:
+                    urls.append(path(url_path, action['view'].as_view(), name=url_name))
         
-        return urls
\ No newline at end of file
+        return urls
+
+class AsyncCRUDView(CRUDView):
+    """
+    CRUDView for ASGI deployments.
+
+    List, detail and delete run as coroutines on the async ORM (aiterator, acount, aget,
+    adelete) with async permission checks. Create and update build formset trees and fall
+    back to the synchronous views in a worker thread. Query diagnostics and phase timings only cover the sync CRUDView.
+    """
+    view_is_async = True
+
+    async def ahas_perms(self, user, permissions):
+        granted = {}
+        for permission in permissions:
+            if hasattr(user, 'ahas_perm'):
+                granted[permission] = await user.ahas_perm(permission)
+            else:
+                granted[permission] = await sync_to_async(user.has_perm)(permission)
+        return granted
+
+    async def dispatch(self, request, *args, **kwargs):
+        view_type = getattr(self, 'view_type', 'list')
+        if view_type in ('api_list', 'api_detail'):
+            return await sync_to_async(self.dispatch_crud_view)(request, *args, **kwargs)
+        user = await request.auser()
+        permission = self.get_permission(view_type)
+        permissions = {permission, *dict(self.restricted_fields).values()}
+        if self.inline_edit_fields:
+            permissions.add(self.get_permission('edit_field'))
+        permissions.update(action['permission'] for action in self.extra_actions if action.get('permission'))
+        if any('update' in action for action in self.extra_actions):
+            permissions.add(self.get_permission('action'))
+        granted = await self.ahas_perms(user, permissions)
+        view_kwargs = self.get_view_kwargs(view_type, granted.__getitem__)
+
+        if self.enforce_model_permissions and not granted[permission]:
+            return HttpResponseForbidden("You do not have permission to perform this action.")
+
+        view_class = self.view_classes[view_type]
+        if view_type in ('create', 'update', 'edit_field', 'action', 'job', 'formset_form'):
+            view = view_class.as_view(**view_kwargs)
+            return await sync_to_async(view)(request, *args, **kwargs)
+
+        view = view_class(**view_kwargs)
+        view.setup(request, *args, **kwargs)
+        allowed_methods = ('get', 'head', 'post') if view_type == 'delete' else ('get', 'head')
+        if request.method.lower() not in allowed_methods:
+            return view.http_method_not_allowed(request, *args, **kwargs)
+        if view_type == 'list':
+            return await self.alist(view)
+        if view_type == 'detail':
+            return await self.adetail(view)
+        return await self.adelete(view)
+
+    async def aget_object(self, view):
+        queryset = view.get_queryset()
+        try:
+            return await queryset.aget(pk=view.kwargs['pk'])
+        except queryset.model.DoesNotExist:
+            raise Http404(f'No {queryset.model._meta.verbose_name} found matching the query')
+
+    async def alist(self, view):
+        queryset = view.get_queryset()
+        list_rows = await view.aget_list_rows(queryset)
+        total_count = None
+        if view.count_strategy and 'cursor' not in view.request.GET:
+            total_count = await view.aget_total_count(queryset)
+
+        view.object_list = queryset
+        # Context building may still touch lazy relations and template tags query the
+        # database, so it runs in a thread once the page's rows are already loaded
+        context = await sync_to_async(view.get_context_data)(list_rows=list_rows, total_count=total_count)
+        return view.render_to_response(context)
+
+    async def adetail(self, view):
+        view.object = await self.aget_object(view)
+        context = await sync_to_async(view.get_context_data)(object=view.object)
+        return view.render_to_response(context)
+
+    async def adelete(self, view):
+        view.object = await self.aget_object(view)
+        if view.request.method == 'POST':
+            if view.background_delete:
+                return await sync_to_async(view.start_background_delete)()
+            success_url = view.get_success_url()
+            await view.object.adelete()
+            if view.caches_totals:
+                await sync_to_async(invalidate_cached_counts)(self.model)
+            return view.pin_reads_to_primary(HttpResponseRedirect(success_url))
+
+        context = await sync_to_async(view.get_context_data)(object=view.object)
+        return view.render_to_response(context)
@@ -0,0 +1,253 @@
+"""
+Query-count, latency and memory benchmarks for every generated CRUD route.
+
+Skipped unless ORANGE_SHERBERT_BENCHMARK=1. Knobs (all environment variables):
+
+    ORANGE_SHERBERT_BENCHMARK_SCALES     comma-separated book counts (default "1000"; e.g. "1000,100000,1000000")
+    ORANGE_SHERBERT_BENCHMARK_CHILDREN   book requests per book and comments per request (default 3)
+    ORANGE_SHERBERT_BENCHMARK_REPEAT     timed runs per route; the median is reported (default 5)
+    ORANGE_SHERBERT_BENCHMARK_OUTPUT     JSON results path (default "benchmark-results.json")
+
+Usage: ORANGE_SHERBERT_BENCHMARK=1 pytest src/test/benchmark_tests.py
+"""
+
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import time
+import tracemalloc
+from datetime import date
+from decimal import Decimal
+
+import django
+import pytest
+from asgiref.sync import async_to_sync
+from django.db import connection
+from django.test import AsyncClient
+from django.urls import reverse
+
+from example.models import Author, Book, BookRequest, RequestComment
+from example.views import AuthorCRUDView, BookCRUDView
+from orange_sherbert.view import CRUDView
+
+SCALES = [int(scale) for scale in os.environ.get('ORANGE_SHERBERT_BENCHMARK_SCALES', '1000').split(',')]
+CHILDREN = int(os.environ.get('ORANGE_SHERBERT_BENCHMARK_CHILDREN', '3'))
+REPEAT = int(os.environ.get('ORANGE_SHERBERT_BENCHMARK_REPEAT', '5'))
+OUTPUT = os.environ.get('ORANGE_SHERBERT_BENCHMARK_OUTPUT', 'benchmark-results.json')
+BATCH_SIZE = 5000
+
+pytestmark = pytest.mark.skipif(
+    not os.environ.get('ORANGE_SHERBERT_BENCHMARK'),
+    reason='set ORANGE_SHERBERT_BENCHMARK=1 to run benchmarks',
+)
+
+
+class SyncAuthorCRUDView(CRUDView):
+    """Synchronous twin of the example AuthorCRUDView, for the ASGI concurrency comparison."""
+    model = Author
+    fields = '__all__'
+    search_fields = ['name']
+    url_prefix = 'sync-author'
+
+
+# URLconf for the concurrency benchmark (see pytest.mark.urls below)
+urlpatterns = [*BookCRUDView.get_urls(), *AuthorCRUDView.get_urls(), *SyncAuthorCRUDView.get_urls()]
+
+
+def get_route_scenarios():
+    """Every route from get_urls() plus the htmx search/filter/sort and formset add requests."""
+    scenarios = []
+    for view_class in (BookCRUDView, AuthorCRUDView):
+        actions = {action['name']: action for action in view_class.extra_actions}
+        for pattern in view_class.get_urls():
+            action = actions.get(pattern.name.split('-', 1)[1])
+            method = action.get('method', 'POST') if action else 'GET'
+            needs_pk = '<' in str(pattern.pattern)
+            if pattern.name.endswith('-job'):
+                continue  # Polled after a background delete, not a standalone route
+            if pattern.name.endswith('-formset-form'):
+                continue  # Needs formset params; covered by the add-formset scenarios below
+            if pattern.name.endswith('-edit-field'):
+                for field in view_class.inline_edit_fields:
+                    scenarios.append((f'{pattern.name}:{field}', 'GET', pattern.name, {'field': field}, {}, {}))
+                continue
+            # Declarative actions answer a repeat POST whose condition no longer holds with a 409;
+            # as htmx requests they re-render the row instead, so every timed run succeeds
+            headers = {'HTTP_HX_REQUEST': 'true'} if action and 'update' in action else {}
+            scenarios.append((pattern.name, method, pattern.name, needs_pk, {}, headers))
+
+    htmx = {'HTTP_HX_REQUEST': 'true'}
+    scenarios += [
+        ('book-list-search', 'GET', 'book-list', False, {'search': 'Book 1'}, htmx),
+        ('book-list-filter', 'GET', 'book-list', False, {'author': '{author}', 'checked_out': 'false', 'pub_date__gte': '2000-01-01'}, htmx),
+        ('book-list-sort', 'GET', 'book-list', False, {'sort': 'author,-title'}, htmx),
+        ('book-add-formset', 'GET', 'book-formset-form', False,
+            {'formset_class': 'bookrequest', 'prefix': 'bookrequest', 'form_index': '{children}'}, htmx),
+        ('book-add-nested-formset', 'GET', 'book-formset-form', False,
+            {'formset_class': 'requestcomment', 'prefix': 'bookrequest-0-requestcomment', 'form_index': '{children}'}, htmx),
+    ]
+    return scenarios
+
+
+SCENARIOS = get_route_scenarios()
+
+
+def seed(book_count):
+    authors = Author.objects.bulk_create(Author(name=f'Author {i}') for i in range(max(book_count // 100, 1)))
+    for start in range(0, book_count, BATCH_SIZE):
+        books = Book.objects.bulk_create(
+            Book(
+                title=f'Book {i}',
+                author=authors[i % len(authors)],
+                isbn=f'{i:013d}',
+                price=Decimal(i % 100) + Decimal('0.99'),
+                pub_date=date(2000 + i % 25, 1 + i % 12, 1 + i % 28),
+                checked_out=bool(i % 3),
+                location=f'Shelf {i % 50}',
+            )
+            for i in range(start, min(start + BATCH_SIZE, book_count))
+        )
+        requests = BookRequest.objects.bulk_create(
+            BookRequest(book=book, requester_name=f'Reader {j}', requester_email=f'reader{j}@example.com')
+            for book in books
+            for j in range(CHILDREN)
+        )
+        RequestComment.objects.bulk_create(
+            RequestComment(request=request, comment=f'Comment {k}')
+            for request in requests
+            for k in range(CHILDREN)
+        )
+    return authors[0], Book.objects.order_by('pk').first()
+
+
+@pytest.fixture(scope='module')
+def results():
+    collected = []
+    yield collected
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True).stdout.strip()
+    except OSError:
+        commit = None
+    with open(OUTPUT, 'w') as fh:
+        json.dump({
+            'commit': commit,
+            'django': django.get_version(),
+            'database': connection.vendor,
+            'children_per_parent': CHILDREN,
+            'repeat': REPEAT,
+            'results': collected,
+        }, fh, indent=2)
+
+
+@pytest.fixture(scope='module', params=SCALES, ids=lambda scale: f'{scale}-books')
+def dataset(request, django_db_setup, django_db_blocker):
+    with django_db_blocker.unblock():
+        author, book = seed(request.param)
+        yield {'scale': request.param, 'author': author, 'book': book}
+        with connection.cursor() as cursor:
+            for model in (RequestComment, BookRequest, Book, Author):
+                cursor.execute(f'DELETE FROM {connection.ops.quote_name(model._meta.db_table)}')
+
+
+def measure(client, method, url, data, headers):
+    client_request = client.get if method == 'GET' else client.post
+
+    def request(url, data, **headers):
+        response = client_request(url, data, **headers)
+        # Streamed bodies (the JSON API list) only run their queries while being read
+        if response.streaming:
+            b''.join(response.streaming_content)
+        return response
+
+    query_count = 0
+
+    # Counted with an execute wrapper: CaptureQueriesContext stops counting once
+    # connection.queries_log (capped at 9000 entries) is full on large datasets
+    def count_queries(execute, sql, params, many, context):
+        nonlocal query_count
+        query_count += 1
+        return execute(sql, params, many, context)
+
+    timings = []
+    for _ in range(REPEAT):
+        query_count = 0
+        with connection.execute_wrapper(count_queries):
+            start = time.perf_counter()
+            response = request(url, data, **headers)
+            timings.append(time.perf_counter() - start)
+
+    # Memory is measured on a separate run so tracemalloc overhead stays out of the timings
+    tracemalloc.start()
+    request(url, data, **headers)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return response, query_count, timings, peak
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('name,method,url_name,needs_pk,data,headers', SCENARIOS, ids=[scenario[0] for scenario in SCENARIOS])
+def test_route_benchmark(client, dataset, results, name, method, url_name, needs_pk, data, headers):
+    book, author = dataset['book'], dataset['author']
+    obj = author if url_name.startswith('author') else book
+    # needs_pk is True, False, or a dict of extra URL kwargs (e.g. the inline edit field)
+    url_kwargs = needs_pk if isinstance(needs_pk, dict) else {}
+    url = reverse(url_name, kwargs={'pk': obj.pk, **url_kwargs}) if needs_pk else reverse(url_name)
+    data = {key: value.format(author=author.pk, children=CHILDREN) for key, value in data.items()}
+
+    response, query_count, timings, peak = measure(client, method, url, data, headers)
+    assert response.status_code < 400
+    if name == 'book-api-list':
+        # Guards against timing a StreamingHttpResponse without reading its body
+        assert response.streaming and query_count > 0
+
+    results.append({
+        'route': name,
+        'method': method,
+        'url': url,
+        'scale': dataset['scale'],
+        'status': response.status_code,
+        'queries': query_count,
+        'wall_time_ms': {
+            'median': statistics.median(timings) * 1000,
+            'min': min(timings) * 1000,
+            'max': max(timings) * 1000,
+        },
+        'peak_memory_kb': peak / 1024,
+    })
+
+
+@pytest.mark.django_db
+@pytest.mark.urls(__name__)
+@pytest.mark.parametrize('url_name', ['sync-author-list', 'author-list'])
+def test_asgi_concurrency_benchmark(dataset, results, url_name):
+    """Serve concurrent list requests through the ASGI handler: sync CRUDView vs AsyncCRUDView."""
+    url = reverse(url_name)
+    concurrency = 20
+    client = AsyncClient()
+
+    async def burst():
+        start = time.perf_counter()
+        responses = await asyncio.gather(*(client.get(url) for _ in range(concurrency)))
+        return time.perf_counter() - start, responses
+
+    timings = []
+    for _ in range(REPEAT):
+        elapsed, responses = async_to_sync(burst)()
+        assert all(response.status_code == 200 for response in responses)
+        timings.append(elapsed)
+
+    results.append({
+        'route': f'asgi-concurrency:{url_name}',
+        'method': 'GET',
+        'url': url,
+        'scale': dataset['scale'],
+        'concurrency': concurrency,
+        'wall_time_ms': {
+            'median': statistics.median(timings) * 1000,
+            'min': min(timings) * 1000,
+            'max': max(timings) * 1000,
+        },
+        'requests_per_second': concurrency / statistics.median(timings),
+    })
@@ -1,7 +1,35 @@
+import json
+import time
 import pytest
 from datetime import date
 from decimal import Decimal
-from example.models import Author, Book
+from io import StringIO
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from django import forms
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.core.checks import run_checks
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import CommandError, call_command
+from django.db import connection, connections, models
+from django.db.models import Count, F
+from django.db.models.signals import post_save
+from django.test import AsyncClient, Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import clear_url_caches, resolve, reverse
+from django.utils.html import escape
+from example import urls
+from example.models import Author, Book, BookRequest, RequestComment
+from example.views import AuthorCRUDView, BookCRUDView
+from orange_sherbert import profiling
+from orange_sherbert import view as crud_view
+from orange_sherbert.diagnostics import QueryBudgetExceeded
+from orange_sherbert.indexes import MAX_COMPOSITES, get_index_candidates, get_missing_indexes, iter_crud_views
+from orange_sherbert.signals import crud_request_timed
+from orange_sherbert.tasks import action_task, enqueue_job, get_job, get_task_path
+from orange_sherbert.testing import assert_crud_query_budget, assert_no_repeated_queries, crud_request
+from orange_sherbert.validation import BatchedModelForm, batched_formfield, check_unique, prefetch_choices
+from orange_sherbert.view import ListRow, invalidate_row_cache
 
 
 @pytest.fixture
@@ -21,6 +49,29 @@ def book(author):
     )
 
 
+@pytest.fixture
+def render_list(rf):
+    """Render a CRUDView's list page for an anonymous, non-htmx request and return its HTML"""
+    def render(view_class):
+        request = rf.get(f'/{view_class.model._meta.model_name}/')
+        request.user = AnonymousUser()
+        request.session = {}
+        request.htmx = False
+        return view_class.as_view(view_type='list')(request).render().content.decode()
+    return render
+
+
+@pytest.fixture
+def crud_urls(monkeypatch):
+    """Route CRUDViews patched by a test ahead of the example project's own URLs"""
+    def route(*view_classes):
+        patterns = [pattern for view_class in view_classes for pattern in view_class.get_urls()]
+        monkeypatch.setattr(urls, 'urlpatterns', [*patterns, *urls.urlpatterns])
+        clear_url_caches()
+    yield route
+    clear_url_caches()
+
+
 @pytest.mark.django_db
 @pytest.mark.parametrize('url_template,needs_object', [
     ('/author/', False),
@@ -44,4 +95,1022 @@ def test_all_views_return_200(client, author, book, url_template, needs_object):
         url = url_template
     
     response = client.get(url)
-    assert response.status_code == 200
\ No newline at end of file
+    assert response.status_code == 200
+
+@pytest.mark.django_db
+def test_list_row_urls_match_reverse(client, book):
+    """Test that precomputed row URLs match Django's reverse()."""
+    response = client.get('/book/')
+    item = response.context['object_data'][0]
+    assert item['urls']['detail'] == reverse('book-detail', args=[book.pk])
+    assert item['urls']['delete'] == reverse('book-delete', args=[book.pk])
+    assert item['actions'][0]['url'] == reverse('book-order-online', args=[book.pk])
+
+
+@pytest.mark.django_db
+def test_list_row_cache_reuses_rendered_cells(render_list, book):
+    """Test that cached rows are served until the row is invalidated."""
+    class CachedBookCRUDView(BookCRUDView):
+        row_cache_timeout = 60
+
+    cache.clear()
+    assert 'Test Book' in render_list(CachedBookCRUDView)
+    Book.objects.filter(pk=book.pk).update(title='Renamed Book')
+    assert 'Test Book' in render_list(CachedBookCRUDView)
+    invalidate_row_cache(book)
+    assert 'Renamed Book' in render_list(CachedBookCRUDView)
+
+
+@pytest.mark.django_db
+def test_update_writes_expire_rows_cached_by_other_views(client, render_list, book):
+    """Test that version-checked saves, and actions that skip post_save, expire rows other views cache."""
+    class CachedBookCRUDView(BookCRUDView):
+        row_cache_timeout = 60
+
+    cache.clear()
+    assert 'Test Book' in render_list(CachedBookCRUDView)
+    url = f'/book/{book.pk}/update/'
+    version = client.get(url).context['version_value']
+    assert client.post(url, {**nested_formset_data(book, []), 'title': 'Renamed', '_version': version}).status_code == 302
+    assert 'Renamed' in render_list(CachedBookCRUDView)
+
+    client.post(f'/book/{book.pk}/check-out/')
+    assert '>True</td>' in render_list(CachedBookCRUDView)
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('count_strategy,search,expected', [
+    ('exact', '', '3'),
+    ('cached', '', '3'),
+    ('estimated', '', '3'),
+    ('estimated', 'Book', '2+'),
+])
+def test_list_total_count_strategies(client, monkeypatch, author, count_strategy, search, expected):
+    """Test that each count strategy reports the expected list total."""
+    for i in range(3):
+        Book.objects.create(
+            title=f'Book {i}', author=author, isbn=str(i), price=Decimal('1.00'), pub_date=date(2024, 1, 1)
+        )
+    cache.clear()
+    monkeypatch.setattr(BookCRUDView, 'count_strategy', count_strategy)
+    monkeypatch.setattr(BookCRUDView, 'count_estimate_cap', 2)
+    response = client.get('/book/', {'search': search})
+    assert response.context['total_count_display'] == expected
+
+
+@pytest.mark.django_db
+def test_inline_edit_expires_cached_counts(client, monkeypatch, book):
+    """Test that an inline edit of a filtered column refreshes a cached list total."""
+    cache.clear()
+    monkeypatch.setattr(BookCRUDView, 'count_strategy', 'cached')
+    assert client.get('/book/', {'location': 'set'}).context['total_count_display'] == '0'
+    client.post(f'/book/{book.pk}/edit-field/location/', {'location': 'Shelf 1'})
+    assert client.get('/book/', {'location': 'set'}).context['total_count_display'] == '1'
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('sort_dir', ['asc', 'desc'])
+def test_infinite_list_walks_every_row_once(client, monkeypatch, author, sort_dir):
+    """Test that keyset chunks cover every row exactly once, even with duplicate sort values."""
+    for i in range(5):
+        Book.objects.create(
+            title=f'Book {i % 2}', author=author, isbn=str(i), price=Decimal('1.00'), pub_date=date(2024, 1, 1)
+        )
+    monkeypatch.setattr(BookCRUDView, 'list_mode', 'infinite')
+    monkeypatch.setattr(BookCRUDView, 'scroll_chunk_size', 2)
+
+    params = {'sort_by': 'title', 'sort_dir': sort_dir}
+    response = client.get('/book/', params)
+    seen = [item['object'].pk for item in response.context['object_data']]
+    while 'next_query' in response.context:
+        response = client.get(f"/book/?{response.context['next_query']}")
+        assert response.templates[0].name == 'orange_sherbert/includes/list_rows.html'
+        seen += [item['object'].pk for item in response.context['object_data']]
+
+    expected = Book.objects.order_by('-title' if sort_dir == 'desc' else 'title', 'pk')
+    assert seen == [book.pk for book in expected]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('sort', ['author', '-author'])
+def test_infinite_list_sorts_relations_like_table_mode(client, monkeypatch, books, sort):
+    """Test that sorting by a relation follows the related model's ordering in both list modes."""
+    monkeypatch.setattr(Author._meta, 'ordering', ['name'])
+    table = [item.object.pk for item in client.get('/book/', {'sort': sort}).context['object_data']]
+
+    monkeypatch.setattr(BookCRUDView, 'list_mode', 'infinite')
+    monkeypatch.setattr(BookCRUDView, 'scroll_chunk_size', 1)
+    response = client.get('/book/', {'sort': sort})
+    seen = [item.object.pk for item in response.context['object_data']]
+    while 'next_query' in response.context:
+        response = client.get(f"/book/?{response.context['next_query']}")
+        seen += [item.object.pk for item in response.context['object_data']]
+
+    by_name = [books[1].pk, books[2].pk, books[0].pk]  # Author 0, Author 1, Test Author
+    assert seen == table == (by_name if sort == 'author' else by_name[::-1])
+
+
+@pytest.mark.django_db
+def test_infinite_list_rejects_tampered_cursor(client, monkeypatch):
+    """Test that a forged cursor is rejected instead of being used in the query."""
+    monkeypatch.setattr(BookCRUDView, 'list_mode', 'infinite')
+    response = client.get('/book/', {'cursor': 'forged'})
+    assert response.status_code == 400
+
+
+@pytest.mark.django_db
+def test_async_crud_view_list_detail_and_delete(author):
+    """Test that the async CRUD view serves list, detail and delete as coroutines."""
+    assert iscoroutinefunction(resolve('/author/').func)
+    client = AsyncClient()
+
+    async def run():
+        list_response = await client.get('/author/')
+        missing_response = await client.get(f'/author/{author.pk + 1}/')
+        delete_response = await client.post(f'/author/{author.pk}/delete/')
+        return list_response, missing_response, delete_response
+
+    list_response, missing_response, delete_response = async_to_sync(run)()
+    assert 'Test Author' in list_response.content.decode()
+    assert missing_response.status_code == 404
+    assert delete_response.status_code == 302
+    assert not Author.objects.filter(pk=author.pk).exists()
+
+
+@pytest.mark.django_db
+def test_async_crud_view_enforces_model_permissions(monkeypatch, django_user_model, author):
+    """Test that an async view with enforced permissions and no inline edit fields serves permitted users."""
+    monkeypatch.setattr(AuthorCRUDView, 'enforce_model_permissions', True)
+    admin = AsyncClient()
+    admin.force_login(django_user_model.objects.create_superuser('admin', 'admin@example.com', 'pw'))
+    reader = AsyncClient()
+    reader.force_login(django_user_model.objects.create_user('reader', password='pw'))
+
+    async def run():
+        return await admin.get('/author/'), await reader.get('/author/')
+
+    admin_response, reader_response = async_to_sync(run)()
+    assert admin_response.status_code == 200 and 'Test Author' in admin_response.content.decode()
+    assert reader_response.status_code == 403
+
+
+@pytest.mark.django_db(databases=['default', 'replica'], transaction=True)
+def test_read_using_routes_reads_to_replica(client, monkeypatch, book):
+    """Test that list/detail reads hit the replica while writes stay on the primary."""
+    monkeypatch.setattr(BookCRUDView, 'read_using', 'replica')
+
+    with CaptureQueriesContext(connections['replica']) as replica_queries:
+        assert client.get('/book/').status_code == 200
+        assert client.get(f'/book/{book.pk}/').status_code == 200
+    assert any('example_book' in query['sql'] for query in replica_queries.captured_queries)
+
+    with CaptureQueriesContext(connections['replica']) as replica_queries:
+        response = client.post(f'/book/{book.pk}/delete/')
+    assert response.status_code == 302
+    assert not replica_queries.captured_queries
+    assert response.cookies['orange_sherbert_primary']['max-age'] == BookCRUDView.read_pin_seconds
+
+    # Pinned clients read their own writes from the primary
+    with CaptureQueriesContext(connections['replica']) as replica_queries:
+        client.get('/book/')
+    assert not replica_queries.captured_queries
+
+
+@pytest.fixture
+def books(author):
+    authors = [author, *(Author.objects.create(name=f'Author {i}') for i in range(2))]
+    return [
+        Book.objects.create(
+            title=f'Book {i}', author=authors[i], isbn=str(i), price=Decimal('1.00'), pub_date=date(2024, 1, 1)
+        )
+        for i in range(3)
+    ]
+
+
+@pytest.mark.django_db
+def test_query_report_attributes_n_plus_one_to_field(client, books):
+    """Test that per-row FK lookups are grouped and traced back to their fields entry."""
+    response, report = crud_request(client, '/book/')
+    assert response.status_code == 200
+    repeated = report.repeated(threshold=3)
+    assert any("fields['author']" in group.sources for group in repeated)
+    with pytest.raises(AssertionError, match=r"fields\['author'\]"):
+        assert_no_repeated_queries(report, threshold=3)
+
+
+@pytest.mark.django_db
+def test_query_budget_fails_when_exceeded(client, settings, monkeypatch, caplog, books):
+    """Test that a view's query_budget fails the test helper and is logged in diagnostics mode."""
+    monkeypatch.setattr(BookCRUDView, 'query_budget', {'list': 2})
+    with pytest.raises(QueryBudgetExceeded, match='budget is 2'):
+        assert_crud_query_budget(client, '/book/')
+    assert_crud_query_budget(client, f'/book/{books[0].pk}/')
+
+    settings.ORANGE_SHERBERT_QUERY_DIAGNOSTICS = True
+    with caplog.at_level('ERROR', logger='orange_sherbert.diagnostics'):
+        assert client.get('/book/').status_code == 200
+    assert 'budget is 2' in caplog.text
+
+
+@pytest.mark.django_db
+def test_instrumented_request_reports_phase_timings(client, settings, book):
+    """Test that instrumented requests emit Server-Timing and the crud_request_timed signal."""
+    received = []
+
+    def receiver(sender, request, view_type, timings, **kwargs):
+        received.append((view_type, {timing['name']: timing for timing in timings}))
+
+    crud_request_timed.connect(receiver)
+    try:
+        assert 'Server-Timing' not in client.get('/book/')
+        settings.ORANGE_SHERBERT_INSTRUMENTATION = True
+        response = client.get('/book/')
+        client.get(f'/book/{book.pk}/update/')
+    finally:
+        crud_request_timed.disconnect(receiver)
+
+    assert 'field_options;dur=' in response['Server-Timing']
+    list_type, list_timings = received[0]
+    assert list_type == 'list'
+    assert {'get_queryset', 'context', 'field_options', 'render', 'total'} <= set(list_timings)
+    assert list_timings['total']['queries'] >= list_timings['field_options']['queries'] > 0
+    update_type, update_timings = received[1]
+    assert {'init_formsets', 'widget_styling'} <= set(update_timings)
+
+
+@pytest.mark.django_db
+def test_profiled_request_downloads_pstats_and_collapsed_stacks(client, settings, tmp_path, django_user_model, book):
+    """Test that superusers can profile a CRUD request and download the result."""
+    settings.ORANGE_SHERBERT_PROFILE_DIR = str(tmp_path)
+
+    assert 'X-Sherbert-Profile' not in client.get('/book/?_profile=1')
+
+    client.force_login(django_user_model.objects.create_superuser('admin', 'admin@example.com', 'pw'))
+    assert 'X-Sherbert-Profile' not in client.get('/book/')
+    profile_url = client.get('/book/?_profile=1')['X-Sherbert-Profile']
+
+    assert client.get(f'{profile_url}?format=pstats').status_code == 200
+    collapsed = client.get(f'{profile_url}?format=collapsed').content.decode()
+    assert any('orange_sherbert.view:get_queryset' in line for line in collapsed.splitlines())
+    assert 'orange_sherbert functions' in client.get(profile_url).content.decode()
+
+    client.logout()
+    assert client.get(profile_url).status_code == 403
+    assert not [message for message in run_checks() if message.id == 'orange_sherbert.W002']
+
+
+@pytest.mark.django_db
+def test_profiling_skips_busy_profiler_and_prunes_old_profiles(client, settings, tmp_path, django_user_model, book):
+    """Test that a request arriving while another is profiled is served unprofiled, and old profiles are deleted."""
+    settings.ORANGE_SHERBERT_PROFILE_DIR = str(tmp_path)
+    settings.ORANGE_SHERBERT_PROFILE_MAX_FILES = 2
+    client.force_login(django_user_model.objects.create_superuser('admin', 'admin@example.com', 'pw'))
+
+    with profiling._profiler_lock:
+        response = client.get('/book/?_profile=1')
+    assert response.status_code == 200 and 'X-Sherbert-Profile' not in response
+
+    for _ in range(3):
+        client.get('/book/?_profile=1')
+    assert len(list(tmp_path.glob('*.pstats'))) == 2
+
+
+@pytest.mark.django_db
+def test_profiling_without_download_urls_serves_unprofiled(client, settings, tmp_path, monkeypatch, crud_urls, django_user_model, book):
+    """Test that the middleware skips profiling, and a check warns, when get_profiling_urls() isn't included."""
+    settings.ORANGE_SHERBERT_PROFILE_DIR = str(tmp_path)
+    monkeypatch.setattr(urls, 'urlpatterns', [
+        pattern for pattern in urls.urlpatterns if getattr(pattern, 'name', None) != 'orange_sherbert-profile'
+    ])
+    crud_urls()
+    client.force_login(django_user_model.objects.create_superuser('admin', 'admin@example.com', 'pw'))
+
+    response = client.get('/book/?_profile=1')
+    assert response.status_code == 200 and 'X-Sherbert-Profile' not in response
+    assert not list(tmp_path.glob('*.pstats'))
+    assert [message.id for message in run_checks() if message.id == 'orange_sherbert.W002'] == ['orange_sherbert.W002']
+
+
+def test_index_advisor_reports_crud_columns():
+    """Test that the index advisor finds routed CRUDViews and their unindexed filter/sort columns."""
+    assert {BookCRUDView, AuthorCRUDView} <= set(iter_crud_views())
+
+    candidates = {(c.kind, c.columns): c.indexed for c in get_index_candidates(BookCRUDView)}
+    assert candidates[('filter', ('author',))] is True
+    assert candidates[('filter', ('checked_out',))] is False
+    assert candidates[('sort', ('price',))] is False  # formatted_price via property_field_map
+    assert candidates[('inline', ('request',))] is True
+    assert ('composite', ('checked_out', 'title')) in candidates
+
+    missing = {(c.model, c.columns) for c in get_missing_indexes()}
+    assert (Book, ('checked_out', 'title')) in missing
+    assert (Book, ('checked_out',)) not in missing  # covered by the composite
+
+    out = StringIO()
+    call_command('sherbert_indexes', stdout=out)
+    assert "models.Index(fields=['checked_out', 'title']" in out.getvalue()
+    assert 'makemigrations' in out.getvalue()
+    with pytest.raises(CommandError):
+        call_command('sherbert_indexes', '--make-migrations')
+
+
+def test_index_advisor_limits_composites_to_equality_filters():
+    """Test that composites pair only equality filters with sorts and are capped."""
+    composites = [c.columns for c in get_index_candidates(BookCRUDView) if c.kind == 'composite']
+    assert 0 < len(composites) <= MAX_COMPOSITES
+    assert not any(columns[0] in ('pub_date', 'location') for columns in composites)  # range/null filters
+
+
+@pytest.mark.django_db
+def test_list_state_travels_in_url_without_session_writes(client, book):
+    """Test that form pages carry the list query string back to the list instead of storing it in the session."""
+    list_query = f'search=Test&author={book.author.pk}'
+    response = client.get(f'/book/{book.pk}/update/?{list_query}&cursor=abc', HTTP_REFERER=f'/book/?{list_query}')
+    assert response.status_code == 200
+    assert f'/book/?{escape(list_query)}"' in response.content.decode()
+    assert 'sessionid' not in response.cookies
+
+    detail = client.get(f'/book/{book.pk}/?{list_query}').content.decode()
+    assert f'/book/{book.pk}/update/?{escape(list_query)}"' in detail
+
+    response = client.post(f'/book/{book.pk}/delete/?{list_query}')
+    assert response['Location'] == f'/book/?{list_query}'
+    assert 'sessionid' not in response.cookies
+
+
+@pytest.mark.django_db
+def test_inline_edit_saves_single_field(client, monkeypatch, crud_urls, book):
+    """Test that inline cell editing renders a one-field form and saves only that column."""
+    monkeypatch.setattr(BookCRUDView, 'inline_edit_fields', ['location', 'formatted_price'])
+    crud_urls(BookCRUDView)
+    edit_url = f'/book/{book.pk}/edit-field/location/'
+
+    assert f'hx-get="/book/{book.pk}/edit-field/formatted_price/"' in client.get('/book/').content.decode()
+    assert f'hx-get="{edit_url}"' in client.get(f'/book/{book.pk}/').content.decode()
+
+    form = client.get(edit_url).content.decode()
+    assert 'name="location"' in form and 'name="title"' not in form
+
+    with CaptureQueriesContext(connection) as queries:
+        response = client.post(edit_url, {'location': 'Shelf 9'}, HTTP_HX_REQUEST='true')
+    assert response.content.decode().strip().endswith('>Shelf 9</td>')
+    assert len(queries) == 2
+    assert 'location' in queries[0]['sql'] and 'title' not in queries[0]['sql']
+    assert 'UPDATE' in queries[1]['sql'] and 'title' not in queries[1]['sql']
+
+    client.post(f'/book/{book.pk}/edit-field/formatted_price/', {'price': '12.50'})
+    book.refresh_from_db()
+    assert (book.location, book.price) == ('Shelf 9', Decimal('12.50'))
+
+    assert client.get(f'/book/{book.pk}/edit-field/title/').status_code == 404
+
+
+@pytest.mark.django_db
+def test_inline_edit_stamps_auto_now_without_version_field(client, monkeypatch, book):
+    """Test that an inline edit refreshes auto_now columns on a view without version_field."""
+    monkeypatch.setattr(BookCRUDView, 'version_field', None)
+    stamped = book.updated_at
+    time.sleep(0.01)
+    client.post(f'/book/{book.pk}/edit-field/location/', {'location': 'Shelf 3'})
+    book.refresh_from_db()
+    assert book.location == 'Shelf 3' and book.updated_at > stamped
+
+
+@pytest.mark.django_db
+def test_declarative_action_runs_single_conditional_update(client, book):
+    """Test that declarative extra actions run one conditional UPDATE and re-render the row over htmx."""
+    with CaptureQueriesContext(connection) as queries:
+        response = client.post(f'/book/{book.pk}/check-out/?search=Test')
+    assert response.status_code == 302
+    assert response['Location'] == '/book/?search=Test'
+    assert len(queries) == 1
+    assert queries[0]['sql'].startswith('UPDATE') and 'title' not in queries[0]['sql']
+    book.refresh_from_db()
+    assert book.checked_out
+
+    # The condition (checked_out=False) no longer holds, so nothing changes
+    assert client.post(f'/book/{book.pk}/check-out/').status_code == 409
+
+    response = client.post(f'/book/{book.pk}/check-in/', HTTP_HX_REQUEST='true')
+    row = response.content.decode()
+    assert row.strip().startswith('<tr>') and 'Test Book' in row
+    book.refresh_from_db()
+    assert not book.checked_out
+
+    assert client.post('/book/987654/check-in/').status_code == 404
+    assert client.get(f'/book/{book.pk}/check-in/').status_code == 405
+
+
+@pytest.mark.django_db
+def test_declarative_action_expires_cached_counts(client, monkeypatch, book):
+    """Test that a declarative action refreshes a cached list total."""
+    cache.clear()
+    monkeypatch.setattr(BookCRUDView, 'count_strategy', 'cached')
+    assert client.get('/book/', {'checked_out': 'true'}).context['total_count_display'] == '0'
+    client.post(f'/book/{book.pk}/check-out/')
+    assert client.get('/book/', {'checked_out': 'true'}).context['total_count_display'] == '1'
+
+
+@pytest.mark.django_db
+def test_declarative_action_permissions_and_f_expressions(client, monkeypatch, crud_urls, django_user_model, book):
+    """Test that declarative actions accept F() updates and enforce their permission."""
+    monkeypatch.setattr(BookCRUDView, 'extra_actions', [
+        {'name': 'discount', 'label': 'Discount', 'update': {'price': F('price') - 1}, 'permission': 'example.change_book'},
+    ])
+    crud_urls(BookCRUDView)
+    client.force_login(django_user_model.objects.create_user('reader', password='pw'))
+    assert 'Discount' not in client.get('/book/').content.decode()
+    assert client.post(f'/book/{book.pk}/discount/').status_code == 403
+
+    client.force_login(django_user_model.objects.create_superuser('admin', 'admin@example.com', 'pw'))
+    assert 'Discount' in client.get('/book/').content.decode()
+    client.post(f'/book/{book.pk}/discount/')
+    client.post(f'/book/{book.pk}/discount/')
+    book.refresh_from_db()
+    assert book.price == Decimal('17.99')
+
+
+def record_progress_job(job, steps):
+    for step in range(1, steps + 1):
+        job.progress(step, steps, f'step {step}')
+    return 'All steps done.'
+
+
+def record_object_database(job, obj):
+    return f'Read from {obj._state.db}.'
+
+
+@pytest.fixture
+def background_author_view(monkeypatch, crud_urls):
+    monkeypatch.setattr(AuthorCRUDView, 'background_delete', True)
+    crud_urls(AuthorCRUDView)
+    return AuthorCRUDView
+
+
+@pytest.mark.django_db
+def test_background_delete_cascades_in_batches(client, settings, monkeypatch, django_user_model, author, background_author_view):
+    """Test that background deletes return a job page and remove every cascaded row in batches."""
+    settings.ORANGE_SHERBERT_TASK_BACKEND = 'orange_sherbert.tasks.ImmediateTaskBackend'
+    monkeypatch.setattr(background_author_view, 'delete_batch_size', 2)
+    for i in range(3):
+        book = Book.objects.create(title=f'Book {i}', author=author, isbn=str(i), price=Decimal('1'), pub_date=date(2024, 1, 1))
+        for j in range(2):
+            request = BookRequest.objects.create(book=book, requester_name='R', requester_email='r@example.com')
+            RequestComment.objects.create(request=request, comment='C')
+
+    client.force_login(django_user_model.objects.create_user('owner', password='pw'))
+    response = client.post(f'/author/{author.pk}/delete/?search=Test')
+    assert response.status_code == 202
+    page = response.content.decode()
+    assert 'Deleted 16 rows.' in page
+    assert '/author/?search=Test' in page
+    assert 'hx-trigger="every 1s"' not in page  # Finished jobs stop polling
+    assert not Author.objects.exists()
+    assert not Book.objects.exists() and not BookRequest.objects.exists() and not RequestComment.objects.exists()
+
+
+@pytest.mark.django_db
+def test_background_delete_blocked_by_protect_deletes_nothing(client, settings, monkeypatch, author, book, background_author_view):
+    """Test that a PROTECT relation anywhere in the cascade tree fails the job before any batch is deleted."""
+    settings.ORANGE_SHERBERT_TASK_BACKEND = 'orange_sherbert.tasks.ImmediateTaskBackend'
+    monkeypatch.setattr(RequestComment._meta.get_field('request').remote_field, 'on_delete', models.PROTECT)
+    request = BookRequest.objects.create(book=book, requester_name='R', requester_email='r@example.com')
+    RequestComment.objects.create(request=request, comment='C')
+
+    response = client.post(f'/author/{author.pk}/delete/')
+    assert response.status_code == 202
+    assert 'Request Comments' in response.content.decode()
+    assert Author.objects.count() == Book.objects.count() == BookRequest.objects.count() == RequestComment.objects.count() == 1
+
+
+@pytest.mark.django_db
+def test_thread_pool_job_reports_progress(client, django_user_model, django_capture_on_commit_callbacks, background_author_view):
+    """Test that thread-pool jobs start on commit, record progress and are only visible to the user who started them."""
+    owner = django_user_model.objects.create_user('owner', password='pw')
+    with django_capture_on_commit_callbacks(execute=True) as callbacks:
+        job_id = enqueue_job(record_progress_job, 3, label='Counting', user=owner, scope='author')
+        time.sleep(0.05)
+        assert get_job(job_id)['status'] == 'pending'  # Not submitted before the transaction commits
+    assert len(callbacks) == 1
+    for _ in range(100):
+        if get_job(job_id)['status'] == 'done':
+            break
+        time.sleep(0.01)
+    job = get_job(job_id)
+    assert (job['status'], job['done'], job['total'], job['message']) == ('done', 3, 3, 'All steps done.')
+
+    client.force_login(owner)
+    assert 'All steps done.' in client.get(f'/author/jobs/{job_id}/', HTTP_HX_REQUEST='true').content.decode()
+    client.force_login(django_user_model.objects.create_user('other', password='pw'))
+    assert client.get(f'/author/jobs/{job_id}/').status_code == 404
+
+    # Another view's jobs URL doesn't serve it
+    client.force_login(owner)
+    other_job_id = enqueue_job(record_progress_job, 1, user=owner, scope='book')
+    assert client.get(f'/author/jobs/{other_job_id}/').status_code == 404
+
+
+@pytest.mark.django_db(databases=['default', 'replica'], transaction=True)
+def test_task_action_reads_the_object_from_the_views_database(client, settings, monkeypatch, crud_urls, book):
+    """Test that a task action's job loads its object from the database the view used."""
+    settings.ORANGE_SHERBERT_TASK_BACKEND = 'orange_sherbert.tasks.ImmediateTaskBackend'
+    monkeypatch.setattr(BookCRUDView, 'extra_actions', [{'name': 'audit', 'label': 'Audit', 'task': record_object_database}])
+    crud_urls(BookCRUDView)
+
+    response = client.post(f'/book/{book.pk}/audit/')
+    assert response.status_code == 202
+    assert response.context['job']['message'] == 'Read from default.'
+
+    job_id = enqueue_job(action_task, 'example.Book', book.pk, get_task_path(record_object_database), 'replica')
+    assert get_job(job_id)['message'] == 'Read from replica.'
+
+
+@pytest.mark.django_db
+def test_anonymous_jobs_are_tied_to_the_starting_session(client, settings, author, background_author_view):
+    """Test that a job started anonymously is only visible to the session that started it."""
+    settings.ORANGE_SHERBERT_TASK_BACKEND = 'orange_sherbert.tasks.ImmediateTaskBackend'
+    response = client.post(f'/author/{author.pk}/delete/')
+    assert response.status_code == 202
+    job_url = f"/author/jobs/{response.context['job']['id']}/"
+    assert client.get(job_url).status_code == 200
+    assert Client().get(job_url).status_code == 404
+
+    # A job queued without a session or user belongs to nobody
+    job_id = enqueue_job(record_progress_job, 1)
+    assert Client().get(f'/author/jobs/{job_id}/').status_code == 404
+
+
+@pytest.mark.django_db
+def test_delete_page_previews_cascade_with_capped_counts(client, monkeypatch, author, book):
+    """Test that the delete page summarises cascaded rows with capped COUNT queries and no row loading."""
+    for _ in range(3):
+        request = BookRequest.objects.create(book=book, requester_name='R', requester_email='r@example.com')
+        RequestComment.objects.create(request=request, comment='C')
+
+    with CaptureQueriesContext(connection) as queries:
+        page = client.get(f'/book/{book.pk}/delete/').content.decode()
+    assert '3 Book Requests' in page
+    assert '3 Request Comments' in page
+    # One object fetch plus one COUNT per cascade relation; related rows are never selected
+    assert len(queries) == 3
+    assert all('COUNT' in query['sql'] for query in queries[1:])
+
+    monkeypatch.setattr(BookCRUDView, 'cascade_preview_cap', 2)
+    page = client.get(f'/book/{book.pk}/delete/').content.decode()
+    assert '2+ Book Requests' in page
+
+    page = client.get(f'/author/{author.pk}/delete/').content.decode()
+    assert '1 Book<' in page and '3 Book Requests' in page
+
+
+@pytest.mark.django_db
+def test_list_rows_are_lazy_slotted_objects(client, monkeypatch, books):
+    """Test that list rows are __slots__ objects whose cell values are read only when rendered."""
+    reads = []
+    original = Book.formatted_price
+    monkeypatch.setattr(Book, 'formatted_price', property(lambda obj: reads.append(obj.pk) or original.fget(obj)))
+
+    response = client.get('/book/')
+    rows = response.context['object_data']
+    assert len(rows) == len(books)
+    row = rows[0]
+    assert isinstance(row, ListRow) and not hasattr(row, '__dict__')
+    assert sorted(reads) == sorted(book.pk for book in books)  # Once per rendered cell
+
+    reads.clear()
+    assert row['urls'] is row.urls
+    cells = row.fields
+    assert reads == []
+    assert dict((name, value) for name, _, value in cells)['formatted_price'] == original.fget(row.object)
+
+
+@pytest.mark.django_db
+def test_json_api_streams_lists_and_round_trips_objects(client, books):
+    """Test that the JSON API streams values() rows, pages by keyset cursor and saves through the form."""
+    response = client.get('/book/api/?search=Book 1')
+    assert response.streaming
+    payload = json.loads(b''.join(response.streaming_content))
+    assert [row['title'] for row in payload['results']] == ['Book 1']
+    assert set(payload['results'][0]) == {'pk', 'title', 'author', 'isbn', 'price', 'pub_date', 'checked_out'}
+
+    page = json.loads(b''.join(client.get('/book/api/?limit=2').streaming_content))
+    assert [row['pk'] for row in page['results']] == [books[0].pk, books[1].pk]
+    page = json.loads(b''.join(client.get(page['next']).streaming_content))
+    assert [row['pk'] for row in page['results']] == [books[2].pk] and page['next'] is None
+
+    detail = client.get(f'/book/api/{books[0].pk}/').json()
+    assert detail['title'] == 'Book 0' and 'ordered_from' not in detail
+    assert client.get('/book/api/999999/').status_code == 404
+
+    response = client.patch(f'/book/api/{books[0].pk}/', {'title': 'Renamed'}, content_type='application/json')
+    assert response.status_code == 200 and response.json()['title'] == 'Renamed'
+    assert Book.objects.get(pk=books[0].pk).isbn == '0'
+    response = client.patch(f'/book/api/{books[0].pk}/', 'title=Form+Renamed', content_type='application/x-www-form-urlencoded')
+    assert response.status_code == 200 and response.json()['title'] == 'Form Renamed'
+    assert Book.objects.get(pk=books[0].pk).isbn == '0'
+
+    data = {'title': 'New', 'author': books[0].author_id, 'isbn': '9', 'price': '2.50', 'pub_date': '2024-02-01'}
+    response = client.post('/book/api/', data, content_type='application/json')
+    assert response.status_code == 201
+    assert client.post('/book/api/', {'title': 'Bad'}, content_type='application/json').json()['errors']['isbn']
+
+    assert client.delete(f'/book/api/{response.json()["pk"]}/').status_code == 204
+    assert client.put('/book/api/').status_code == 405
+
+
+@pytest.mark.django_db(transaction=True)
+def test_async_json_api_streams_from_an_async_iterator(monkeypatch, crud_urls, author):
+    """Test that AsyncCRUDView streams API lists with an async iterator instead of buffering them."""
+    monkeypatch.setattr(AuthorCRUDView, 'api', True)
+    crud_urls(AuthorCRUDView)
+
+    async def run():
+        response = await AsyncClient().get('/author/api/')
+        return response, b''.join([chunk async for chunk in response.streaming_content])
+
+    response, content = async_to_sync(run)()
+    assert response.is_async
+    assert [row['name'] for row in json.loads(content)['results']] == ['Test Author']
+
+
+@pytest.mark.django_db
+def test_multi_column_sort_is_whitelisted_and_ends_on_pk(client, books):
+    """Test that ?sort= orders by several whitelisted columns with a pk tiebreaker."""
+    Book.objects.filter(pk=books[2].pk).update(price=Decimal('0.50'))
+
+    response = client.get('/book/?sort=-formatted_price,title,ordered_from,author__name')
+    assert response.context['sort'] == '-formatted_price,title'
+    assert response.context['object_list'].query.order_by == ('-price', 'title', 'pk')
+    assert [item.object.pk for item in response.context['object_data']] == [books[0].pk, books[1].pk, books[2].pk]
+
+    headers = {header['name']: header for header in response.context['sort_headers']}
+    assert headers['formatted_price']['sort'] == 'formatted_price,title'
+    assert headers['pub_date']['sort'] == 'pub_date,-formatted_price,title'
+    assert headers['title']['position'] == 2 and headers['title']['direction'] == 'asc'
+
+    # Unsorted lists still get a deterministic order
+    assert client.get('/book/').context['object_list'].query.order_by == ('pk',)
+
+
+@pytest.mark.django_db
+def test_typed_filters_compile_to_typed_lookups(client, books):
+    """Test that range, multi, null and boolean filters become typed lookups and ignore bad input."""
+    Book.objects.filter(pk=books[0].pk).update(pub_date=date(2023, 6, 1), location='Shelf A')
+    Book.objects.filter(pk=books[1].pk).update(checked_out=True)
+
+    def pks(query):
+        return sorted(item.object.pk for item in client.get(f'/book/?{query}').context['object_data'])
+
+    assert pks(f'author={books[0].author_id}&author={books[2].author_id}') == [books[0].pk, books[2].pk]
+    assert pks('pub_date__gte=2024-01-01') == [books[1].pk, books[2].pk]
+    assert pks('pub_date__lte=2023-12-31') == [books[0].pk]
+    assert pks('pub_date__gte=not-a-date') == sorted(book.pk for book in books)
+    assert pks('checked_out=true') == [books[1].pk]
+    assert pks('location=set') == [books[0].pk]
+    assert pks('location=empty') == [books[1].pk, books[2].pk]
+
+    response = client.get(f'/book/?author={books[1].author_id}&pub_date__gte=2024-01-01')
+    where = str(response.context['object_list'].query)
+    assert 'IN' in where and '"pub_date" >= 2024-01-01' in where
+    page = response.content.decode()
+    assert 'name="pub_date__gte" value="2024-01-01"' in page
+    assert f'<option value="{books[1].author_id}" selected>' in page
+
+
+@pytest.mark.django_db
+def test_transform_filters_use_raw_values_and_bad_lookups_fail_at_startup(client, monkeypatch, books):
+    """Test that transform lookups like pub_date__year still filter, and unknown lookups fail when URLs are built."""
+    Book.objects.filter(pk=books[0].pk).update(pub_date=date(2023, 6, 1))
+    monkeypatch.setattr(BookCRUDView, 'filter_fields', {**BookCRUDView.filter_fields, 'pub_date__year': 'Year'})
+    BookCRUDView.get_urls()
+
+    response = client.get('/book/?pub_date__year=2023')
+    assert response.status_code == 200
+    assert [item.object.pk for item in response.context['object_data']] == [books[0].pk]
+    assert '<option value="2023"' in response.content.decode()
+
+    for name in ('pub_date__nope', 'title__year', 'nope'):
+        monkeypatch.setattr(BookCRUDView, 'filter_fields', {name: 'Bad'})
+        with pytest.raises(ImproperlyConfigured, match=name):
+            BookCRUDView.get_urls()
+
+
+@pytest.mark.django_db
+def test_aggregate_footer_is_one_query_over_filtered_rows(client, monkeypatch, books):
+    """Test that footer totals cover every filtered row in one aggregate() query and can be cached."""
+    Book.objects.filter(pk=books[0].pk).update(price=Decimal('4.00'), checked_out=True)
+    monkeypatch.setattr(BookCRUDView, 'list_mode', 'infinite')
+    monkeypatch.setattr(BookCRUDView, 'scroll_chunk_size', 1)
+
+    response = client.get('/book/')
+    row = response.context['aggregate_row']
+    columns = list(response.context['fields'])
+    assert row[columns.index('formatted_price')] == [('Sum', Decimal('6.00')), ('Avg', Decimal('2.00'))]
+    assert row[columns.index('checked_out')] == [('Out', 1)]
+    assert row[columns.index('title')] == []
+
+    response = client.get(f'/book/?author={books[1].author_id}')
+    assert response.context['aggregate_row'][columns.index('formatted_price')][0] == ('Sum', Decimal('1.00'))
+
+    monkeypatch.setattr(BookCRUDView, 'aggregate_cache_timeout', 60)
+    client.get('/book/?sort=title')
+    with CaptureQueriesContext(connection) as queries:
+        client.get('/book/?sort=-title')
+    assert not any('SUM' in query['sql'] for query in queries)
+
+    client.post(f'/book/{books[1].pk}/delete/')
+    response = client.get('/book/')
+    assert response.context['aggregate_row'][columns.index('formatted_price')][0] == ('Sum', Decimal('5.00'))
+
+
+@pytest.mark.django_db
+def test_cached_aggregates_are_keyed_by_visible_columns(client, monkeypatch, django_user_model, books):
+    """Test that a restricted user's cached footer isn't served to a user who can see more columns."""
+    cache.clear()
+    monkeypatch.setattr(BookCRUDView, 'aggregate_cache_timeout', 60)
+    monkeypatch.setattr(BookCRUDView, 'fields', {**BookCRUDView.fields, 'ordered_from': 'Ordered From'})
+    monkeypatch.setattr(BookCRUDView, 'aggregates', {**BookCRUDView.aggregates, 'ordered_from': ('Ordered', Count('ordered_from'))})
+    Book.objects.update(ordered_from='Shop')
+
+    client.force_login(django_user_model.objects.create_user('reader', password='pw'))
+    columns = list(client.get('/book/').context['fields'])
+    assert 'ordered_from' not in columns
+
+    client.force_login(django_user_model.objects.create_superuser('admin', 'admin@example.com', 'pw'))
+    response = client.get('/book/')
+    columns = list(response.context['fields'])
+    assert response.context['aggregate_row'][columns.index('ordered_from')] == [('Ordered', len(books))]
+
+
+@pytest.mark.django_db
+def test_add_formset_renders_empty_form_once_per_depth(client, book):
+    """Test that "+ Add" renders each empty inline form once and then only substitutes prefix and index."""
+    crud_view._empty_form_html.clear()
+    data = {'formset_class': 'bookrequest', 'prefix': 'bookrequest', 'form_index': '3'}
+    first = client.post('/book/create/', data, HTTP_HX_REQUEST='true').content.decode()
+    assert 'name="bookrequest-3-requester_name"' in first
+    assert 'name="bookrequest-3-requestcomment-TOTAL_FORMS"' in first
+
+    with CaptureQueriesContext(connection) as queries:
+        again = client.post(f'/book/{book.pk}/update/', {**data, 'form_index': '4'}, HTTP_HX_REQUEST='true').content.decode()
+    assert again == first.replace('bookrequest-3-', 'bookrequest-4-')
+    assert len(queries) == 1  # The object fetch; no inline rows are loaded
+
+    nested = {'formset_class': 'requestcomment', 'prefix': 'bookrequest-2-requestcomment', 'form_index': '0'}
+    html = client.post('/book/create/', nested, HTTP_HX_REQUEST='true').content.decode()
+    assert 'name="bookrequest-2-requestcomment-0-comment"' in html
+    assert len(crud_view._empty_form_html) == 2
+    assert client.post('/book/create/', {**data, 'formset_class': 'nope'}, HTTP_HX_REQUEST='true').status_code == 400
+
+    assert not [message for message in run_checks() if message.id == 'orange_sherbert.W001']
+
+
+@pytest.mark.django_db
+def test_empty_form_depth_comes_from_the_formset_tree(client, monkeypatch, book):
+    """Test that custom prefixes with dashes don't change an empty form's depth, and bad indexes get a 400."""
+    monkeypatch.setattr(BookCRUDView, 'inline_formsets', [
+        {**BookCRUDView.inline_formsets[0], 'prefix': 'book-request-list'},
+        {**BookCRUDView.inline_formsets[1], 'prefix': 'request-comment-list'},
+    ])
+    crud_view._empty_form_html.clear()
+    top = {'formset_class': 'book-request-list', 'prefix': 'book-request-list', 'form_index': '0'}
+    nested = {'formset_class': 'request-comment-list', 'prefix': 'book-request-list-0-request-comment-list', 'form_index': '1'}
+    assert 'name="book-request-list-0-requester_name"' in client.get('/book/formset-form/', top).content.decode()
+    html = client.post('/book/create/', nested, HTTP_HX_REQUEST='true').content.decode()
+    assert 'name="book-request-list-0-request-comment-list-1-comment"' in html
+    assert set(crud_view._empty_form_html) == {
+        (BookCRUDView, 'book-request-list', 0), (BookCRUDView, 'request-comment-list', 1),
+    }
+
+    response = client.post('/book/create/', {**nested, 'form_index': 'x'}, HTTP_HX_REQUEST='true')
+    assert response.status_code == 400
+
+
+@pytest.mark.django_db
+def test_empty_forms_with_dynamic_markup_are_not_cached(client, monkeypatch, book):
+    """Test that empty inline forms with callable defaults are rendered fresh on every "+ Add"."""
+    names = iter(['First', 'Second'])
+    monkeypatch.setattr(BookRequest._meta.get_field('requester_name'), 'default', lambda: next(names))
+    crud_view._empty_form_html.clear()
+    data = {'formset_class': 'bookrequest', 'prefix': 'bookrequest', 'form_index': '0'}
+    assert 'value="First"' in client.post('/book/create/', data, HTTP_HX_REQUEST='true').content.decode()
+    assert 'value="Second"' in client.post('/book/create/', data, HTTP_HX_REQUEST='true').content.decode()
+    assert not any(key[1] == 'bookrequest' for key in crud_view._empty_form_html)
+
+
+@pytest.mark.django_db
+def test_form_pages_embed_empty_form_templates_per_depth(client, book):
+    """Test that each formset ships its empty form as a <template> with depth-specific placeholders."""
+    page = client.get(f'/book/{book.pk}/update/').content.decode()
+
+    assert '<template id="bookrequest-empty-form">' in page
+    assert 'name="bookrequest-__prefix0__-requester_name"' in page
+    # The nested comment template inside the cloned request keeps its own placeholder
+    assert '<template id="bookrequest-__prefix0__-requestcomment-empty-form">' in page
+    assert 'name="bookrequest-__prefix0__-requestcomment-__prefix1__-comment"' in page
+    assert "replaceAll('__prefix0__', total.value)" in page
+    assert 'hx-post=""' not in page
+
+
+@pytest.mark.django_db
+def test_formset_form_endpoint_skips_object_and_formset_queries(client, book):
+    """Test that the dedicated formset-form endpoint returns an empty inline form without touching the database."""
+    params = {'formset_class': 'requestcomment', 'prefix': 'bookrequest-1-requestcomment', 'form_index': '2'}
+    client.get('/book/formset-form/', params)
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get('/book/formset-form/', params, HTTP_HX_REQUEST='true')
+    assert response.status_code == 200
+    assert 'name="bookrequest-1-requestcomment-2-comment"' in response.content.decode()
+    assert len(queries) == 0
+
+    assert client.get('/book/formset-form/', {**params, 'formset_class': 'book'}).status_code == 400
+    assert client.get('/book/formset-form/', {**params, 'form_index': 'x'}).status_code == 400
+    assert client.get('/author/formset-form/').status_code == 404
+
+
+def nested_formset_data(book, requests):
+    """POST data for the book update form with its request and comment formsets"""
+    data = {
+        'title': book.title, 'author': book.author_id, 'isbn': book.isbn, 'price': book.price,
+        'pub_date': book.pub_date, 'checked_out': '', 'location': '',
+        'bookrequest-TOTAL_FORMS': len(requests), 'bookrequest-INITIAL_FORMS': len(requests),
+    }
+    for i, request in enumerate(requests):
+        prefix = f'bookrequest-{i}'
+        data.update({
+            f'{prefix}-id': request.pk, f'{prefix}-book': book.pk,
+            f'{prefix}-requester_name': request.requester_name, f'{prefix}-requester_email': request.requester_email,
+        })
+        comments = list(request.comments.all())
+        data[f'{prefix}-requestcomment-TOTAL_FORMS'] = len(comments)
+        data[f'{prefix}-requestcomment-INITIAL_FORMS'] = len(comments)
+        for j, comment in enumerate(comments):
+            data.update({
+                f'{prefix}-requestcomment-{j}-id': comment.pk,
+                f'{prefix}-requestcomment-{j}-request': request.pk,
+                f'{prefix}-requestcomment-{j}-comment': comment.comment,
+            })
+    return data
+
+
+@pytest.mark.django_db
+def test_formset_tree_validates_in_one_query_per_level(client, monkeypatch, book):
+    """Test that inline pks are resolved per tree level, not per form, and fail-fast skips later levels."""
+    requests = [BookRequest.objects.create(book=book, requester_name=f'R{i}', requester_email='r@example.com') for i in range(3)]
+    for request in requests:
+        RequestComment.objects.bulk_create(RequestComment(request=request, comment=f'C{j}') for j in range(4))
+
+    data = nested_formset_data(book, requests)
+    with CaptureQueriesContext(connection) as queries:
+        assert client.post(f'/book/{book.pk}/update/', data).status_code == 302
+    comment_selects = [query for query in queries if query['sql'].startswith('SELECT') and 'requestcomment' in query['sql']]
+    # One queryset per comment formset plus a single IN lookup for all twelve submitted pks
+    assert len(comment_selects) == len(requests) + 1
+    assert not any('requestcomment"."id" = ' in query['sql'] for query in queries)
+
+    data['bookrequest-2-requestcomment-0-id'] = 999999
+    response = client.post(f'/book/{book.pk}/update/', data)
+    comment_form = response.context['formsets']['bookrequest'].forms[2].children[0].forms[0]
+    assert 'id' in comment_form.errors
+
+    monkeypatch.setattr(BookCRUDView, 'validation_fail_fast', True)
+    data['bookrequest-0-requester_email'] = 'not-an-email'
+    response = client.post(f'/book/{book.pk}/update/', data)
+    assert response.status_code == 200
+    request_forms = response.context['formsets']['bookrequest'].forms
+    assert 'requester_email' in request_forms[0].errors
+    assert not request_forms[2].children[0].forms[0].errors  # Never validated
+
+
+@pytest.mark.django_db
+def test_batched_unique_checks_flag_taken_values(books):
+    """Test that deferred unique checks run as one query and exclude the form's own row."""
+    BookForm = forms.modelform_factory(Book, form=BatchedModelForm, fields=['isbn'])
+    taken = BookForm({'isbn': books[1].isbn}, instance=Book(title='New', author=books[0].author))
+    own = BookForm({'isbn': books[0].isbn}, instance=books[0])
+    free = BookForm({'isbn': 'unused'}, instance=Book(title='Other', author=books[0].author))
+    for form in (taken, own, free):
+        form.is_valid()
+        form.deferred_unique_checks = [(Book, ('isbn',))]
+
+    with CaptureQueriesContext(connection) as queries:
+        assert check_unique([taken, own, free]) is False
+    assert len(queries) == 1
+    assert 'isbn' in taken.errors and own.is_valid() and free.is_valid()
+
+
+@pytest.mark.django_db
+def test_prefetched_choices_respect_each_forms_queryset(books):
+    """Test that a form narrowing a batched field's queryset isn't validated against another form's choices."""
+    other = Author.objects.create(name='Other Author')
+    BookForm = forms.modelform_factory(Book, form=BatchedModelForm, fields=['author'], formfield_callback=batched_formfield)
+    wide = BookForm({'author': other.pk})
+    narrow = BookForm({'author': other.pk})
+    narrow.fields['author'].queryset = Author.objects.exclude(pk=other.pk)
+
+    prefetch_choices([wide, narrow])
+    assert wide.is_valid()
+    assert 'author' in narrow.errors
+
+
+@pytest.mark.django_db
+def test_update_saves_changed_fields_and_rejects_stale_version(client, book):
+    """Test that updates write only changed columns and a stale version gets a conflict, not a save."""
+    url = f'/book/{book.pk}/update/'
+    version = client.get(url).context['version_value']
+    data = {**nested_formset_data(book, []), 'title': 'Renamed', '_version': version}
+
+    with CaptureQueriesContext(connection) as queries:
+        assert client.post(url, data).status_code == 302
+    claim, update = [query['sql'] for query in queries if query['sql'].startswith('UPDATE')]
+    assert '"title"' not in claim and '"updated_at"' in claim
+    assert '"title"' in update and '"updated_at"' in update and '"isbn"' not in update
+    book.refresh_from_db()
+    assert book.title == 'Renamed'
+
+    # Someone else saved since `version` was read
+    data['title'] = 'Clobbered'
+    response = client.post(url, data)
+    assert response.status_code == 409
+    assert 'Clobbered' in response.content.decode()
+    book.refresh_from_db()
+    assert book.title == 'Renamed'
+
+    del data['_version']
+    assert client.post(url, data).status_code == 302
+    book.refresh_from_db()
+    assert book.title == 'Clobbered'
+
+    with CaptureQueriesContext(connection) as queries:
+        assert client.post(url, data).status_code == 302
+    assert not any(query['sql'].startswith('UPDATE') for query in queries)
+
+
+@pytest.mark.django_db
+def test_update_saves_fields_set_by_hooks_through_save(client, monkeypatch, book):
+    """Test that fields a form_valid hook sets outside the form are saved, with post_save sent on version-checked saves."""
+    monkeypatch.setattr(BookCRUDView, 'form_valid', lambda self, form: setattr(form.instance, 'ordered_from', 'Hook'), raising=False)
+    saved = []
+
+    def receiver(sender, instance, update_fields, **kwargs):
+        saved.append(set(update_fields))
+
+    url = f'/book/{book.pk}/update/'
+    response = client.get(url)
+    assert 'ordered_from' not in response.context['form'].fields
+    data = {**nested_formset_data(book, []), 'title': 'Renamed', '_version': response.context['version_value']}
+    post_save.connect(receiver, sender=Book)
+    try:
+        assert client.post(url, data).status_code == 302
+    finally:
+        post_save.disconnect(receiver, sender=Book)
+    book.refresh_from_db()
+    assert (book.title, book.ordered_from) == ('Renamed', 'Hook')
+    assert saved == [{'title', 'ordered_from', 'updated_at'}]
+
+
+@pytest.mark.django_db
+def test_version_check_covers_actions_inline_edits_and_formset_changes(client, book):
+    """Test that every write path bumps version_field, so a stale update form conflicts instead of reverting it."""
+    url = f'/book/{book.pk}/update/'
+    stale = {**nested_formset_data(book, []), 'title': 'Stale'}
+
+    version = client.get(url).context['version_value']
+    client.post(f'/book/{book.pk}/check-out/')
+    assert client.post(url, {**stale, '_version': version}).status_code == 409
+
+    version = client.get(url).context['version_value']
+    client.post(f'/book/{book.pk}/edit-field/location/', {'location': 'Shelf 2'})
+    assert client.post(url, {**stale, '_version': version}).status_code == 409
+    book.refresh_from_db()
+    assert (book.title, book.checked_out, book.location) == ('Test Book', True, 'Shelf 2')
+
+    # Adding an inline row is a write too, even with the book's own fields unchanged
+    version = client.get(url).context['version_value']
+    book.refresh_from_db()
+    inline_only = {
+        **nested_formset_data(book, []), 'checked_out': 'on', 'location': 'Shelf 2', '_version': version,
+        'bookrequest-TOTAL_FORMS': 1, 'bookrequest-0-requester_name': 'R', 'bookrequest-0-requester_email': 'r@example.com',
+        'bookrequest-0-requestcomment-TOTAL_FORMS': 0, 'bookrequest-0-requestcomment-INITIAL_FORMS': 0,
+    }
+    assert client.post(url, inline_only).status_code == 302
+    assert BookRequest.objects.filter(book=book).count() == 1
+    assert client.post(url, {**stale, '_version': version}).status_code == 409
+
+
+@pytest.mark.django_db
+def test_list_row_cache_expires_with_related_rows(render_list, book, author):
+    """Test that saving a row shown through a foreign key column re-renders rows that display it."""
+    class CachedBookCRUDView(BookCRUDView):
+        row_cache_timeout = 60
+
+    cache.clear()
+    assert 'Test Author' in render_list(CachedBookCRUDView)
+    author.name = 'Renamed Author'
+    author.save()
+    assert 'Renamed Author' in render_list(CachedBookCRUDView)
+
+    # A plain save() of the book, e.g. from a custom action view, also expires its row
+    book.title = 'Saved Title'
+    book.save()
+    assert 'Saved Title' in render_list(CachedBookCRUDView)